@@ -2,7 +2,7 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Dict, Optional, List, Literal
 from docling_parser.parser.schemas import DocumentInput
-from docling_parser.parser.pipeline import ParserPipeline
+from docling_parser.parser.pipeline import ParserPipeline, ParsingError
 import yaml
 
 description = """
@@ -72,6 +72,9 @@ async def parse_pdf(
         chunks: List[str] = parser.run(params)
         return {"chunks": chunks}
     
+    except ParsingError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
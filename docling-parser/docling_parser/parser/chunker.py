@@ -1,6 +1,14 @@
-from typing import List
+from typing import List, Tuple
 from chonkie import SemanticChunker, SDPMChunker
 from chonkie import SentenceTransformerEmbeddings
+from docling_core.types.doc import (
+    DoclingDocument,
+    SectionHeaderItem,
+    TitleItem,
+    TableItem,
+    ListItem,
+    TextItem,
+)
 
 
 class SemanticChunking:
@@ -35,3 +43,116 @@ class SemanticChunking:
         chunks = self.chunker.chunk(text)
         chunk_texts = [chunk.text for chunk in chunks]
         return chunk_texts
+
+
+class StructuralChunking:
+    """
+    Chunk a DoclingDocument along its layout hierarchy.
+
+    Sections (a heading and the elements under it) are packed whole into
+    `chunk_size` windows. Only a section that does not fit in a single window
+    is split: its tables are kept intact as their own chunks and the text
+    between them is handed to the semantic chunker.
+    """
+
+    def __init__(
+            self,
+            model="minishlab/potion-base-8M",
+            chunk_size=1536,
+            similarity_threshold=0.75,
+            double_pass_merge=True,
+            device="cpu"
+            ) -> None:
+        self.chunk_size = chunk_size
+        # The semantic chunker is only used on oversized sections, and its
+        # tokenizer defines the unit of chunk_size for both chunkers.
+        self.semantic = SemanticChunking(
+            model=model,
+            chunk_size=chunk_size,
+            similarity_threshold=similarity_threshold,
+            double_pass_merge=double_pass_merge,
+            device=device
+        )
+
+    def count_tokens(self, text: str) -> int:
+        return self.semantic.model.count_tokens(text)
+
+    @staticmethod
+    def extract_sections(document: DoclingDocument) -> List[Tuple[str, List[Tuple[str, str]]]]:
+        """
+        Walk the document body in reading order and group its elements under their headings.
+        :param document: The parsed DoclingDocument
+        :return: A list of (heading, elements) where each element is a (kind, text) tuple
+        """
+        sections = [("", [])]
+        for item, _ in document.iterate_items():
+            if isinstance(item, (TitleItem, SectionHeaderItem)):
+                heading_level = getattr(item, "level", 0) + 1
+                sections.append(("#" * heading_level + " " + item.text.strip(), []))
+
+            elif isinstance(item, TableItem):
+                table = item.export_to_markdown(doc=document).strip()
+                if table:
+                    sections[-1][1].append(("table", table))
+
+            elif isinstance(item, ListItem):
+                marker = item.marker.strip() if item.marker else "-"
+                if item.text.strip():
+                    sections[-1][1].append(("text", f"{marker} {item.text.strip()}"))
+
+            elif isinstance(item, TextItem):
+                if item.text.strip():
+                    sections[-1][1].append(("text", item.text.strip()))
+
+        return [(heading, elements) for heading, elements in sections if heading or elements]
+
+    def split_section(self, heading: str, elements: List[Tuple[str, str]]) -> List[str]:
+        """
+        Split a section that does not fit in one window.
+        Tables are emitted whole; runs of text between them are chunked semantically.
+        """
+        chunks = []
+        text_run = []
+
+        def flush_text():
+            if text_run:
+                for chunk in self.semantic.chunk("\n\n".join(text_run)):
+                    chunks.append(self.with_heading(heading, chunk.strip()))
+                text_run.clear()
+
+        for kind, text in elements:
+            if kind == "table":
+                flush_text()
+                chunks.append(self.with_heading(heading, text))
+            else:
+                text_run.append(text)
+        flush_text()
+
+        return chunks
+
+    @staticmethod
+    def with_heading(heading: str, body: str) -> str:
+        return f"{heading}\n\n{body}" if heading else body
+
+    def chunk(self, document: DoclingDocument) -> List[str]:
+        chunks = []
+        window, window_tokens = [], 0
+
+        for heading, elements in self.extract_sections(document):
+            section = self.with_heading(heading, "\n\n".join(text for _, text in elements))
+            section_tokens = self.count_tokens(section)
+
+            if window and window_tokens + section_tokens > self.chunk_size:
+                chunks.append("\n\n".join(window))
+                window, window_tokens = [], 0
+
+            if section_tokens > self.chunk_size:
+                chunks.extend(self.split_section(heading, elements))
+            else:
+                window.append(section)
+                window_tokens += section_tokens
+
+        if window:
+            chunks.append("\n\n".join(window))
+
+        return [chunk for chunk in chunks if chunk.strip()]
@@ -10,7 +10,7 @@ from docling.datamodel.base_models import InputFormat, ConversionStatus
 from docling.document_converter import DocumentConverter, PdfFormatOption
 from docling.backend.docling_parse_backend import DoclingParseDocumentBackend
 from docling.backend.pypdfium2_backend import PyPdfiumDocumentBackend
-from docling_core.types.doc import ImageRefMode
+from docling_core.types.doc import ImageRefMode, DoclingDocument
 from typing import Union, List, Generator, Optional, Literal
 import torch
 import gc
@@ -71,13 +71,14 @@ class DoclingParserLarge:
 
         yield from self.converter.convert_all(paths)
 
-    def parse_and_export(
+    def parse_documents(
         self,
         paths: Union[str, List[str]],
         ocr_language: Optional[Literal["latin-based", "arabic-based", "bengali-based", "cyrillic-based", "devanagari-based", "chinese-traditional", "chinese-simplified", "japanese", "korean", "telugu", "kannada", "thai"]] = "latin-based",
         **kwargs,
-    ) -> List[str]:
+    ) -> List[DoclingDocument]:
         """
+        Parse the given PDF files and return the DoclingDocument of each one.
         """
         if isinstance(paths, str):
             paths = [paths]
@@ -129,10 +130,7 @@ class DoclingParserLarge:
         data = []
         for _, result in enumerate(self.load_documents(paths)):
             if result.status == ConversionStatus.SUCCESS:
-                md = result.document.export_to_markdown(
-                    image_mode=ImageRefMode.PLACEHOLDER,
-                )
-                data.append(md)
+                data.append(result.document)
 
             else:
                 raise ValueError(f"Failed to parse the document: {result.errors}")
@@ -142,7 +140,21 @@ class DoclingParserLarge:
         gc.collect()
         return data
 
-    
+    def parse_and_export(
+        self,
+        paths: Union[str, List[str]],
+        ocr_language: Optional[Literal["latin-based", "arabic-based", "bengali-based", "cyrillic-based", "devanagari-based", "chinese-traditional", "chinese-simplified", "japanese", "korean", "telugu", "kannada", "thai"]] = "latin-based",
+        **kwargs,
+    ) -> List[str]:
+        """
+        Parse the given PDF files and export each one to markdown.
+        """
+        documents = self.parse_documents(paths, ocr_language=ocr_language, **kwargs)
+        return [
+            document.export_to_markdown(image_mode=ImageRefMode.PLACEHOLDER)
+            for document in documents
+        ]
+
     @staticmethod
     def map_language(language:str) -> List[str]:
         if language == "latin-based":
@@ -334,13 +346,14 @@ class DoclingPDFParser:
 
         yield from self.converter.convert_all(paths)
 
-    def parse_and_export(
+    def parse_documents(
         self,
         paths: Union[str, List[str]],
         ocr_language: Optional[Literal["latin-based", "arabic-based", "bengali-based", "cyrillic-based", "devanagari-based", "chinese-traditional", "chinese-simplified", "japanese", "korean", "telugu", "kannada", "thai"]] = "latin-based",
         **kwargs,
-    ) -> List[str]:
+    ) -> List[DoclingDocument]:
         """
+        Parse the given PDF files and return the DoclingDocument of each one.
         """
         if isinstance(paths, str):
             paths = [paths]
@@ -392,10 +405,7 @@ class DoclingPDFParser:
         data = []
         for _, result in enumerate(self.load_documents(paths)):
             if result.status == ConversionStatus.SUCCESS:
-                md = result.document.export_to_markdown(
-                    image_mode=ImageRefMode.PLACEHOLDER,
-                )
-                data.append(md)
+                data.append(result.document)
 
             else:
                 raise ValueError(f"Failed to parse the document: {result.errors}")
@@ -403,7 +413,22 @@ class DoclingPDFParser:
         torch.cuda.synchronize()
         gc.collect()
         return data
-    
+
+    def parse_and_export(
+        self,
+        paths: Union[str, List[str]],
+        ocr_language: Optional[Literal["latin-based", "arabic-based", "bengali-based", "cyrillic-based", "devanagari-based", "chinese-traditional", "chinese-simplified", "japanese", "korean", "telugu", "kannada", "thai"]] = "latin-based",
+        **kwargs,
+    ) -> List[str]:
+        """
+        Parse the given PDF files and export each one to markdown.
+        """
+        documents = self.parse_documents(paths, ocr_language=ocr_language, **kwargs)
+        return [
+            document.export_to_markdown(image_mode=ImageRefMode.PLACEHOLDER)
+            for document in documents
+        ]
+
     @staticmethod
     def map_language(language:str) -> List[str]:
         if language == "latin-based":
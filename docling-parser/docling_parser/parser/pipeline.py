@@ -1,7 +1,8 @@
-from typing import Literal, List
+from typing import Literal, List, Union
 from docling_parser.parser.docling_parse import DoclingPDFParser, DoclingParserLarge
 from docling_parser.parser.schemas import DocumentInput
-from docling_parser.parser.chunker import SemanticChunking
+from docling_parser.parser.chunker import SemanticChunking, StructuralChunking
+from docling_core.types.doc import DoclingDocument, ImageRefMode
 import logging
 import os
 import time
@@ -12,6 +13,12 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
+class ParsingError(Exception):
+    """
+    Raised when a file cannot be parsed or yields no usable content.
+    """
+
+
 class ParserPipeline:
     """
     PDFParser class for parsing PDF files.
@@ -39,13 +46,25 @@ class ParserPipeline:
         self.save_dir = save_dir
         self.parser_options = parser_options
 
+        self.chunking_method = chunking_method
         if chunking_method == "Semantic":
             self.chunker = SemanticChunking(**chunking_options)
+        elif chunking_method == "Structural":
+            self.chunker = StructuralChunking(**chunking_options)
         else:
             raise ValueError(f"Invalid chunking method specified: {chunking_method}")
 
     @staticmethod
     def post_process(content: str) -> str:
+        content = ParserPipeline.clean_text(content)
+
+        if not content:
+            raise ParsingError("File is empty after parsing.")
+        
+        return content
+
+    @staticmethod
+    def clean_text(content: str) -> str:
         # remove glyph placeholders
         regex_pattern = r"GLYPH<[^>]+>"
         content = re.sub(regex_pattern, "", content).strip()
@@ -56,24 +75,38 @@ class ParserPipeline:
 
         regex_pattern = r"\\{1,2}_"
         content = re.sub(regex_pattern, ".", content).strip()
-
-        if not content:
-            content = "File is empty after Parsing"
-        
         return content
 
     def chunk_file(
             self,
-            content: str
+            content: Union[DoclingDocument, str]
     ) -> List[str]:
         """
+        Chunk the parsed content. Documents are chunked along their structure
+        when the Structural chunker is configured, markdown text semantically.
         """
+        if isinstance(content, DoclingDocument):
+            if self.chunking_method == "Structural":
+                chunks = [self.clean_text(chunk) for chunk in self.chunker.chunk(content)]
+                chunks = [chunk for chunk in chunks if chunk]
+                if not chunks:
+                    raise ParsingError("File is empty after parsing.")
+                return chunks
+            content = self.post_process(self.to_markdown(content))
+
+        if self.chunking_method == "Structural":
+            return self.chunker.semantic.chunk(content)
         return self.chunker.chunk(content)
 
+    def to_markdown(self, document: DoclingDocument) -> str:
+        return self.escape_markdown(
+            document.export_to_markdown(image_mode=ImageRefMode.PLACEHOLDER)
+        )
+
     def parse_file(
             self, 
             input_data: DocumentInput,
-            ) -> str:
+            ) -> DoclingDocument:
         """
         """
         # Parse the PDF file and extract text content
@@ -91,7 +124,7 @@ class ParserPipeline:
                 file_name=file_name,
                 size=input_data.size,
                 language=input_data.language,
-                content=content
+                content=self.to_markdown(content)
             )
 
             # Replace the file extension (.pdf or .PDF) with .md
@@ -101,15 +134,14 @@ class ParserPipeline:
             with open(markdown_file_path, "w") as f:
                 f.write(markdown)
 
-        # Post-process the content
-        content = self.post_process(content)
         return content
 
-    def parse(self, input_data: DocumentInput) -> str:
+    def parse(self, input_data: DocumentInput) -> DoclingDocument:
         """
-        Parses the PDF file and returns the conversion results as markdown text.
+        Parses the PDF file and returns the conversion result as a DoclingDocument.
         :param file_path: Path to the PDF file.
-        :return: Markdown representation of the parsed content.
+        :return: The parsed document.
+        :raises ParsingError: If the file could not be parsed.
         """
         file_path = input_data.file_path
         language = input_data.language
@@ -119,26 +151,26 @@ class ParserPipeline:
             logger.info(f"Parsing a large file of size {size}.")
 
             try:
-                output: List[str] = self.parser_large.parse_and_export(
+                output: List[DoclingDocument] = self.parser_large.parse_documents(
                     file_path,
                     **self.parser_options,
                     ocr_language=language
                     )
-                return self.escape_markdown(output[0])
+                return output[0]
             except Exception as e:
-                return f"Error parsing PDF file: {e}"
+                raise ParsingError(f"Error parsing PDF file: {e}") from e
 
 
         try:
-            output: List[str] = self.parser.parse_and_export(
+            output: List[DoclingDocument] = self.parser.parse_documents(
                 file_path, 
                 **self.parser_options, 
                 ocr_language=language
                 )
-            return self.escape_markdown(output[0])
+            return output[0]
         
         except Exception as e:
-            return f"Error parsing PDF file: {e}"
+            raise ParsingError(f"Error parsing PDF file: {e}") from e
 
 
     @staticmethod
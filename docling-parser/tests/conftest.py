@@ -0,0 +1,23 @@
+from types import SimpleNamespace
+from typing import List
+import pytest
+
+from docling_parser.parser import chunker
+
+
+class Semantic:
+    """Counts words as tokens and splits text at paragraph breaks, recording every call."""
+
+    def __init__(self, **options):
+        self.model = SimpleNamespace(count_tokens=lambda text: len(text.split()))
+        self.calls: List[str] = []
+
+    def chunk(self, text: str) -> List[str]:
+        self.calls.append(text)
+        return text.split("\n\n")
+
+
+@pytest.fixture
+def semantic(monkeypatch):
+    # The real semantic chunker loads an embedding model
+    monkeypatch.setattr(chunker, "SemanticChunking", Semantic)
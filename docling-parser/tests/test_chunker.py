@@ -0,0 +1,83 @@
+from typing import List
+import pytest
+
+from docling_core.types.doc import DoclingDocument, DocItemLabel, TableData, TableCell
+from docling_parser.parser.chunker import StructuralChunking
+
+
+@pytest.fixture
+def structural(semantic):
+    return StructuralChunking(chunk_size=20)
+
+
+def words(n: int, word: str = "carbon") -> str:
+    return " ".join([word] * n)
+
+
+def add_table(document: DoclingDocument, rows: List[List[str]]) -> None:
+    cells = [
+        TableCell(
+            text=text,
+            start_row_offset_idx=r, end_row_offset_idx=r + 1,
+            start_col_offset_idx=c, end_col_offset_idx=c + 1,
+            column_header=r == 0
+        )
+        for r, row in enumerate(rows)
+        for c, text in enumerate(row)
+    ]
+    document.add_table(data=TableData(num_rows=len(rows), num_cols=len(rows[0]), table_cells=cells))
+
+
+def test_sections_are_packed_up_to_the_chunk_size(structural):
+    document = DoclingDocument(name="report")
+    for heading in ("Policy", "Targets", "Lobbying"):
+        document.add_heading(text=heading, level=1)
+        document.add_text(label=DocItemLabel.PARAGRAPH, text=words(6))
+
+    chunks = structural.chunk(document)
+
+    # Each section counts 8 tokens, so two fit in 20 and the third starts a new chunk
+    assert chunks == [
+        f"## Policy\n\n{words(6)}\n\n## Targets\n\n{words(6)}",
+        f"## Lobbying\n\n{words(6)}",
+    ]
+    assert all(structural.count_tokens(chunk) <= 20 for chunk in chunks)
+    assert structural.semantic.calls == []
+
+
+def test_oversized_section_falls_back_to_the_semantic_chunker(structural):
+    document = DoclingDocument(name="report")
+    document.add_heading(text="Policy", level=1)
+    document.add_text(label=DocItemLabel.PARAGRAPH, text=words(15, "pricing"))
+    document.add_text(label=DocItemLabel.PARAGRAPH, text=words(15, "allowances"))
+
+    chunks = structural.chunk(document)
+
+    assert structural.semantic.calls == [f"{words(15, 'pricing')}\n\n{words(15, 'allowances')}"]
+    assert chunks == [f"## Policy\n\n{words(15, 'pricing')}", f"## Policy\n\n{words(15, 'allowances')}"]
+
+
+def test_tables_are_never_split(structural):
+    rows = [["Year", "Scope 1", "Scope 2"]] + [[str(2000 + i), str(i), str(2 * i)] for i in range(10)]
+    document = DoclingDocument(name="report")
+    document.add_heading(text="Emissions", level=1)
+    document.add_text(label=DocItemLabel.PARAGRAPH, text=words(10, "before"))
+    add_table(document, rows)
+    document.add_text(label=DocItemLabel.PARAGRAPH, text=words(10, "after"))
+
+    chunks = structural.chunk(document)
+
+    table_chunks = [chunk for chunk in chunks if "Scope 1" in chunk]
+    assert len(table_chunks) == 1
+    assert all(str(2000 + i) in table_chunks[0] for i in range(10))
+    assert table_chunks[0].startswith("## Emissions\n\n|")
+    # Only the text around the table goes through the semantic chunker
+    assert structural.semantic.calls == [words(10, "before"), words(10, "after")]
+
+
+def test_list_items_keep_their_marker(structural):
+    document = DoclingDocument(name="report")
+    group = document.add_group(label="list", name="positions")
+    document.add_list_item(text="Supports the EU ETS", marker="-", parent=group)
+
+    assert structural.chunk(document) == ["- Supports the EU ETS"]
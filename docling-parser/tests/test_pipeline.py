@@ -0,0 +1,31 @@
+import pytest
+
+# The pipeline loads the docling parsers
+pytest.importorskip("docling")
+
+from docling_core.types.doc import DoclingDocument, DocItemLabel
+from docling_parser.parser import pipeline
+from docling_parser.parser.pipeline import ParserPipeline
+
+
+@pytest.fixture
+def structural_pipeline(semantic, monkeypatch):
+    monkeypatch.setattr(pipeline, "DoclingPDFParser", lambda: None)
+    monkeypatch.setattr(pipeline, "DoclingParserLarge", lambda: None)
+    return ParserPipeline(chunking_method="Structural", chunking_options={"chunk_size": 20})
+
+
+def test_plain_text_is_chunked_semantically(structural_pipeline):
+    chunks = structural_pipeline.chunk_file("We support carbon pricing.\n\nWe oppose the ETS.")
+
+    assert chunks == ["We support carbon pricing.", "We oppose the ETS."]
+    assert structural_pipeline.chunker.semantic.calls == ["We support carbon pricing.\n\nWe oppose the ETS."]
+
+
+def test_documents_are_chunked_along_their_structure(structural_pipeline):
+    document = DoclingDocument(name="report")
+    document.add_heading(text="Policy", level=1)
+    document.add_text(label=DocItemLabel.PARAGRAPH, text="We support carbon pricing.")
+
+    assert structural_pipeline.chunk_file(document) == ["## Policy\n\nWe support carbon pricing."]
+    assert structural_pipeline.chunker.semantic.calls == []
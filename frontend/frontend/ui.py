@@ -3,7 +3,7 @@ import requests
 import datetime
 import yaml
 import os
-from utils import retriever_call, generator_call, upload_call, list_collection, get_collections, save_collection, add_to_collection, check_file_in_map, list_prompts, delete_prompt, delete_call
+from utils import retriever_batch_call, generators_call, FAILED_STANCE_TEXT, upload_call, list_collection, get_collections, save_collection, add_to_collection, check_file_in_map, list_prompts, delete_prompt, delete_call
 
 
 config_path = "/app/config.yaml"
@@ -120,13 +120,52 @@ def render_pdf_docs(msg_index: int, pdf_docs_struct: dict):
             "File": e["evidence"].get("file_name", "N/A"),
             "Date": e["evidence"].get("date", "N/A"),
             "Region": e["evidence"].get("region", "N/A"),
-            "Confidence": round(e.get("confidence_score", 0.0), 3),
+            # None for candidates reused from the semantic cache of a similar query
+            "Confidence": None if e.get("confidence_score") is None else round(e["confidence_score"], 3),
             "Evidence": e["evidence"].get("content", ""),
         }
         for i, e in enumerate(pdf_evidences)
     ]
     st.dataframe(summary_rows, use_container_width=True, hide_index=True)
 
+    # ---------- Generate the Stances of all Kept Chunks in One Call ----------
+    col1, col2 = st.columns([1, 1], vertical_alignment="bottom")
+    with col1:
+        generate = st.button("🧠 Generate Stances", key=f"genstances_msg_{msg_index}", use_container_width=True)
+    with col2:
+        # Generate every kept chunk again, bypassing the API's stance cache
+        regenerate = st.button("🔄 Regenerate Stances", key=f"regenstances_msg_{msg_index}", use_container_width=True)
+
+    if generate or regenerate:
+        pending = []
+        for idx, evidence_item in enumerate(pdf_evidences):
+            chunk_key = f"msg_{msg_index}_chunk_{idx}"
+            if st.session_state.removals.get(chunk_key, False):
+                continue
+            generated_stance = st.session_state.generated_stances.get(chunk_key, {})
+            # Failed generations stay pending so that they can be retried
+            if (
+                not regenerate
+                and generated_stance.get("stance") is not None
+                and generated_stance.get("stance_text") != FAILED_STANCE_TEXT
+            ):
+                continue
+            pending.append((chunk_key, evidence_item.get("evidence", {}).get("content", "").strip()))
+
+        if pending:
+            with st.spinner(f"Analyzing the stance of {len(pending)} chunks..."):
+                stance_payloads = generators_call(
+                    query=query,
+                    evidences=[content for _, content in pending],
+                    refresh=regenerate
+                )
+            for (chunk_key, _), stance_payload in zip(pending, stance_payloads):
+                st.session_state.generated_stances.setdefault(chunk_key, {}).update({
+                    **stance_payload,
+                    "updated_generated_stance": stance_payload["stance"]
+                })
+            st.rerun()
+
     st.markdown("---")
 
     # ---------- Evidence Review ----------
@@ -138,6 +177,7 @@ def render_pdf_docs(msg_index: int, pdf_docs_struct: dict):
         region = doc.get("region", "N/A")
         file_name = doc.get("file_name", "N/A")
         conf_score = evidence_item.get("confidence_score", 0.0)
+        conf_text = "N/A" if conf_score is None else f"{conf_score:.3f}"
 
         chunk_key = f"msg_{msg_index}_chunk_{idx}"
         st.session_state.removals.setdefault(chunk_key, False)
@@ -159,11 +199,11 @@ def render_pdf_docs(msg_index: int, pdf_docs_struct: dict):
             st.markdown(f"**📅 Date:** `{date}`")
             st.markdown(f"**🌍 Region:** `{region}`")
             st.markdown(f"**✍️ Author:** `{author}`")
-            st.markdown(f"**📈 Confidence Score:** `{conf_score:.3f}`")
+            st.markdown(f"**📈 Confidence Score:** `{conf_text}`")
            
 
-        # ---- Controls: Remove / Rank / Generate ----
-        col1, col2, col3 = st.columns([1, 1, 1], vertical_alignment="bottom")
+        # ---- Controls: Remove / Rank ----
+        col1, col2 = st.columns([1, 1], vertical_alignment="bottom")
 
         with col1:
             remove_label = "✅ Keep" if st.session_state.removals[chunk_key] else "🗑️ Remove"
@@ -182,17 +222,6 @@ def render_pdf_docs(msg_index: int, pdf_docs_struct: dict):
                 )
                 st.session_state.ranks[chunk_key] = int(rank.split(" ")[-1]) - 1
 
-        with col3:
-            if not st.session_state.removals[chunk_key]:
-                if st.button("🧠 Generate Stance", key=f"genstance_{chunk_key}", use_container_width=True):
-                    with st.spinner("Analyzing stance..."):
-                        stance_payload = generator_call(query=query, evidence=content)
-                        st.session_state.generated_stances[chunk_key].update({
-                            **stance_payload,
-                            "updated_generated_stance": stance_payload["stance"]
-                        })
-                        st.rerun()
-
         # ---- Stance Review and Selection ----
         if not st.session_state.removals[chunk_key]:
             stance_data = st.session_state.generated_stances[chunk_key]
@@ -725,45 +754,44 @@ def handle_chat_input(author, date, region, filename, num_documents):
         st.session_state["process"] = False
         st.rerun()
 
-    # --- Process Prompts One by One ---
+    # --- Process the Queued Prompts in One Batch ---
     if st.session_state.prompt_queue:
-        current_prompt = st.session_state.prompt_queue.pop(0)
+        prompts = st.session_state.prompt_queue
+        st.session_state.prompt_queue = []
 
-        st.chat_message("user").markdown(current_prompt["query"])
-        st.session_state.messages.append({
-            "role": "user",
-            "content": current_prompt["prompt"]
-        })
-        success = False
-        with st.spinner(f"Retrieving information..."):
+        responses = None
+        with st.spinner(f"Retrieving information for {len(prompts)} queries..."):
             for _ in range(2):  # Try up to 2 times
                 try:
-                    response = retriever_call(
-                        query=current_prompt["prompt"],
+                    responses = retriever_batch_call(
+                        queries=[prompt["prompt"] for prompt in prompts],
                         author=author,
                         date=date,
                         region=region,
                         file_name=filename,
                         top_k=num_documents
                     )
-
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "pdf_docs": response["pdf_docs"]
-                    })
-                    success = True
                     break  # Success, no need to retry
 
                 except Exception as e:
                     error_message = str(e)
-                    
 
-        if not success:
+        for idx, prompt in enumerate(prompts):
             st.session_state.messages.append({
-                "role": "assistant",
-                "content": f"❌ **Failed to retrieve results** for: `{current_prompt['query']}`."
+                "role": "user",
+                "content": prompt["prompt"]
             })
-            st.session_state.failed_prompts.append(current_prompt)
+            if responses is not None:
+                st.session_state.messages.append({
+                    "role": "assistant",
+                    "pdf_docs": responses[idx]["pdf_docs"]
+                })
+            else:
+                st.session_state.messages.append({
+                    "role": "assistant",
+                    "content": f"❌ **Failed to retrieve results** for: `{prompt['query']}`."
+                })
+                st.session_state.failed_prompts.append(prompt)
 
         st.rerun()
     # --- Retry UI for Failed Prompts ---
@@ -2,7 +2,10 @@ from typing import Optional, Dict, List, Union
 import requests
 import json
 import os
-    
+
+# The stance_text of a stance that could not be generated, by the API or by a failed call
+FAILED_STANCE_TEXT = "Failed to generate stance."
+
 def check_file_in_map(file_name: str, DATA_MAP: str) -> bool:
     existing_files = list_collection(DATA_MAP)
     for file in existing_files:
@@ -139,10 +142,41 @@ def generator_call(
     except:
         return {
             "stance": 0,
-            "stance_text": "Failed to generate stance.",
+            "stance_text": FAILED_STANCE_TEXT,
             "stance_score": 0.0
         }
 
+def generators_call(
+        query: str,
+        evidences: List[str],
+        author: Optional[str] = None,
+        refresh: bool = False
+        ) -> List[Dict]:
+    
+    payload = {
+        "query": query,
+        "evidences": evidences,
+        "author": author,
+        "refresh": refresh
+    }
+
+    try:
+        response = requests.post("http://rag_api:8001/generate/stances", json=payload)
+        response.raise_for_status()
+
+        generator_response = response.json()
+        return generator_response["stances"]
+    
+    except:
+        return [
+            {
+                "stance": 0,
+                "stance_text": FAILED_STANCE_TEXT,
+                "stance_score": 0.0
+            }
+            for _ in evidences
+        ]
+
 def retriever_call(
         query: str,
         author: Optional[str] = "",
@@ -170,3 +204,31 @@ def retriever_call(
     
     except:
         return {"pdf_docs": {}}
+
+def retriever_batch_call(
+        queries: List[str],
+        author: Optional[str] = "",
+        date: Optional[str] = "",
+        region: Optional[str] = "",
+        file_name: Optional[str] = "",
+        top_k: Optional[Union[float, int]] = 5
+        ) -> List[Dict]:
+    
+    payload = {
+        "queries": queries,
+        "author": author,
+        "date": date,
+        "region": region,
+        "file_name": file_name,
+        "top_k": top_k
+    }
+
+    try:
+        response = requests.post("http://rag_api:8001/retrieve/batch", json=payload)
+        response.raise_for_status()
+
+        response_data = response.json()
+        return response_data["results"]
+    
+    except Exception as e:
+        raise Exception(f"Failed to retrieve results. {e}")
@@ -0,0 +1,112 @@
+"""
+Concurrency benchmark for the RAG API.
+
+Fires requests at a running API with a fixed number of requests in flight and
+reports p50/p99 latency and throughput per endpoint. Run it once against the
+old image and once against the new one to compare, e.g.:
+
+    python benchmarks/concurrency.py --base-url http://localhost:8001 --scenario mixed --concurrency 16
+
+The "mixed" scenario sends slow stance generations alongside cheap count
+requests; with a blocking event loop the cheap requests inherit the latency of
+the slow ones.
+"""
+from typing import Dict, List
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import httpx
+
+
+QUERY = "Does the company support carbon pricing?"
+EVIDENCE = (
+    "We support a well-designed, economy-wide price on carbon as the most "
+    "cost-effective way to reduce greenhouse gas emissions."
+)
+
+SCENARIOS = {
+    "count": [("GET", "/collections/count", {})],
+    "retrieve": [("GET", "/retrieve/filter", {"query": QUERY, "top_k": 5})],
+    "stance": [("GET", "/generate/stance", {"query": QUERY, "evidence": EVIDENCE})],
+    "mixed": [
+        ("GET", "/generate/stance", {"query": QUERY, "evidence": EVIDENCE}),
+        ("GET", "/retrieve/filter", {"query": QUERY, "top_k": 5}),
+        ("GET", "/collections/count", {}),
+        ("GET", "/collections/count", {}),
+    ],
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+    return values[index]
+
+
+async def worker(client: httpx.AsyncClient, jobs: asyncio.Queue, latencies: Dict[str, List[float]], errors: Dict[str, int]):
+    while True:
+        try:
+            method, path, params = jobs.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, params=params)
+            response.raise_for_status()
+            latencies.setdefault(path, []).append(time.perf_counter() - start)
+        except httpx.HTTPError:
+            errors[path] = errors.get(path, 0) + 1
+
+
+async def run(base_url: str, scenario: str, requests: int, concurrency: int, timeout: float) -> Dict:
+    jobs: asyncio.Queue = asyncio.Queue()
+    pattern = SCENARIOS[scenario]
+    for i in range(requests):
+        jobs.put_nowait(pattern[i % len(pattern)])
+
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client, jobs, latencies, errors) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "scenario": scenario,
+        "requests": requests,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2),
+        "endpoints": {
+            path: {
+                "count": len(values),
+                "errors": errors.get(path, 0),
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+                "mean_ms": round(statistics.fmean(values) * 1000, 1),
+            }
+            for path, values in latencies.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="mixed")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.base_url, args.scenario, args.requests, args.concurrency, args.timeout))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
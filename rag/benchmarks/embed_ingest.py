@@ -0,0 +1,132 @@
+"""
+Benchmark ingest with precomputed vectors against module-driven vectorization.
+
+Creates a scratch collection configured like the production one (a
+text2vec_ollama named vector "content_vector") in a local Weaviate and loads
+the same synthetic chunks twice: once letting the vectorizer module call
+Ollama per object, once embedding in batches with ChunkEmbedder and inserting
+the vectors. Reports chunks/second for both, and the parity of the two: the
+cosine similarity between the module's vector and the client's vector of each
+chunk, which must stay above PARITY_MIN_SIMILARITY for both to share one
+vector space:
+
+    python benchmarks/embed_ingest.py --chunks 500 --model nomic-embed-text:latest
+
+Pass --vectorize-collection-name to measure a collection created before the
+vectorizer stopped prepending the collection name to the content.
+"""
+from typing import Dict, List
+from pathlib import Path
+import argparse
+import json
+import sys
+import time
+import uuid
+import weaviate
+from weaviate.classes.config import Configure, Property, DataType
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "rag"))
+from lobbymap_search.etl.pipeline import PdfDocumentPipeline, PARITY_MIN_SIMILARITY
+from lobbymap_search.etl.embedder import ChunkEmbedder, cosine_similarity
+from ingest import make_chunks
+
+
+def create_collection(client, name: str, model: str, module_endpoint: str, vectorize_collection_name: bool):
+    if client.collections.exists(name):
+        client.collections.delete(name)
+    return client.collections.create(
+        name=name,
+        vectorizer_config=[
+            Configure.NamedVectors.text2vec_ollama(
+                name="content_vector",
+                source_properties=["content"],
+                model=model,
+                api_endpoint=module_endpoint,
+                vectorize_collection_name=vectorize_collection_name
+            )
+        ],
+        properties=[
+            Property(name="file_name", data_type=DataType.TEXT),
+            Property(name="author", data_type=DataType.TEXT),
+            Property(name="date", data_type=DataType.TEXT),
+            Property(name="region", data_type=DataType.TEXT),
+            Property(name="size", data_type=DataType.NUMBER),
+            Property(name="language", data_type=DataType.TEXT),
+            Property(name="content", data_type=DataType.TEXT),
+        ]
+    )
+
+
+def parity(client, name: str, embedder: ChunkEmbedder, uuids: List[str]) -> Dict:
+    collection = client.collections.get(name)
+    objects = [collection.query.fetch_object_by_id(u, include_vector=True) for u in uuids]
+    objects = [obj for obj in objects if obj is not None]
+    vectors = embedder.embed([obj.properties["content"] for obj in objects])
+    similarities = [
+        cosine_similarity(obj.vector["content_vector"], vector)
+        for obj, vector in zip(objects, vectors)
+    ]
+    return {
+        "min_cosine": round(min(similarities), 6),
+        "mean_cosine": round(sum(similarities) / len(similarities), 6),
+        "same_space": min(similarities) >= PARITY_MIN_SIMILARITY,
+    }
+
+
+def timed(pipeline: PdfDocumentPipeline, chunk_dicts: List[Dict], uuids: List[str]) -> Dict:
+    start = time.perf_counter()
+    failed = pipeline._load_into_vdb(chunk_dicts, uuids)
+    duration = time.perf_counter() - start
+    return {
+        "seconds": round(duration, 2),
+        "chunks_per_s": round(len(chunk_dicts) / duration, 1),
+        "failed": len(failed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--model", default="nomic-embed-text:latest")
+    parser.add_argument("--ollama-host", default="http://localhost:11434", help="Ollama as seen from this script")
+    parser.add_argument(
+        "--module-endpoint", default="http://host.docker.internal:11434",
+        help="Ollama as seen from the Weaviate container"
+    )
+    parser.add_argument("--chunks", type=int, default=500)
+    parser.add_argument("--chunk-chars", type=int, default=1500)
+    parser.add_argument("--duplicates", type=float, default=0.1, help="share of chunks repeating another chunk's text")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--parity-sample", type=int, default=50, help="module-embedded chunks compared with the client's vectors")
+    parser.add_argument("--vectorize-collection-name", action="store_true")
+    args = parser.parse_args()
+
+    chunk_dicts = make_chunks(args.chunks, args.chunk_chars)
+    # Repeated boilerplate (headers, disclaimers) is common in the corpus
+    for i in range(int(len(chunk_dicts) * args.duplicates)):
+        chunk_dicts[-1 - i]["content"] = chunk_dicts[i]["content"]
+
+    client = weaviate.connect_to_local(host=args.host)
+    name = "Bench_embed_ingest"
+    results = {"chunks": args.chunks, "duplicates": args.duplicates}
+    embedder = ChunkEmbedder(args.model, host=args.ollama_host, batch_size=args.batch_size)
+    try:
+        for mode in ["module", "client"]:
+            create_collection(client, name, args.model, args.module_endpoint, args.vectorize_collection_name)
+            pipeline = PdfDocumentPipeline(
+                collection_name=name, vectorizer=args.model, embedder=embedder if mode == "client" else None
+            )
+            pipeline.client = client
+            uuids = [str(uuid.uuid4()) for _ in chunk_dicts]
+            results[mode] = timed(pipeline, chunk_dicts, uuids)
+            if mode == "module":
+                results["parity"] = parity(client, name, embedder, uuids[:args.parity_sample])
+        client.collections.delete(name)
+    finally:
+        client.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark hybrid (BM25 + vector) retrieval against pure vector search.
+
+Sends every prompt of the prompt set to /retrieve/filter of a running API once
+per search mode and reports latency and recall@k per mode. There are no
+relevance labels for the prompt set, so recall is measured against a pool:
+a chunk is relevant if any mode retrieved it and the reranker scored it at or
+above --relevance-threshold, and each mode's recall is the share of that pool
+it retrieved. Pass --queries to add queries of your own, e.g. exact terms:
+
+    python benchmarks/hybrid.py --base-url http://localhost:8001 --top-k 10 \\
+        --alphas 0.5 0.75 --author "Some Company" --queries CBAM "EPA-HQ-OAR-2021-0427"
+
+Latency is only meaningful for requests that miss the result cache, so run it
+right after an insert or delete (which invalidates the cache) or with new queries.
+"""
+from typing import Dict, List, Optional
+import argparse
+import hashlib
+import json
+import statistics
+import time
+import httpx
+
+from concurrency import percentile
+
+
+def evidence_id(evidence: Dict) -> str:
+    return hashlib.sha256(
+        (evidence["file_name"] + "\x00" + evidence["content"]).encode("utf-8")
+    ).hexdigest()
+
+
+def run_mode(client: httpx.Client, queries: List[str], params: Dict) -> Dict:
+    latencies, results = [], {}
+    for query in queries:
+        start = time.perf_counter()
+        response = client.get("/retrieve/filter", params={"query": query, **params})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        results[query] = {
+            evidence_id(e["evidence"]): e["rank_score"]
+            for e in response.json()["pdf_docs"]["evidences"]
+        }
+    return {"latencies": latencies, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--prompt-map", default="../data/documents/prompt_map.json")
+    parser.add_argument("--queries", nargs="*", default=[], help="extra queries besides the prompt set")
+    parser.add_argument("--author", default="")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--alphas", type=float, nargs="+", default=[0.5, 0.75])
+    parser.add_argument("--relevance-threshold", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    with open(args.prompt_map, "r") as f:
+        queries = [p["prompt"] for p in json.load(f)] + args.queries
+
+    modes: Dict[str, Dict] = {"vector": {"mode": "vector"}}
+    for alpha in args.alphas:
+        modes[f"hybrid_alpha_{alpha}"] = {"mode": "hybrid", "alpha": alpha}
+
+    runs = {}
+    with httpx.Client(base_url=args.base_url, timeout=args.timeout) as client:
+        for name, mode in modes.items():
+            runs[name] = run_mode(client, queries, {"author": args.author, "top_k": args.top_k, **mode})
+
+    recalls: Dict[str, List[Optional[float]]] = {name: [] for name in modes}
+    for query in queries:
+        pool = set()
+        for run in runs.values():
+            pool.update(k for k, score in run["results"][query].items() if score >= args.relevance_threshold)
+        for name, run in runs.items():
+            recalls[name].append(len(pool & set(run["results"][query])) / len(pool) if pool else None)
+
+    report = {}
+    for name, run in runs.items():
+        judged = [r for r in recalls[name] if r is not None]
+        report[name] = {
+            "p50_ms": round(percentile(run["latencies"], 50) * 1000, 1),
+            "p99_ms": round(percentile(run["latencies"], 99) * 1000, 1),
+            f"recall@{args.top_k}": round(statistics.fmean(judged), 3) if judged else None,
+        }
+    print(json.dumps({"queries": len(queries), "modes": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
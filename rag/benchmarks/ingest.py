@@ -0,0 +1,102 @@
+"""
+Benchmark ingest throughput (chunks/second) against a local Weaviate.
+
+Loads synthetic chunks into a scratch collection (no vectorizer, so the
+numbers measure the loader rather than embedding) with the former loader
+(fixed-size batches of 5 followed by gc.collect()) and with
+PdfDocumentPipeline._load_into_vdb:
+
+    python benchmarks/ingest.py --chunks 1000 10000
+"""
+from typing import Dict, List
+from pathlib import Path
+import argparse
+import json
+import sys
+import time
+import uuid
+import gc
+import weaviate
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "rag"))
+from lobbymap_search.etl.pipeline import PdfDocumentPipeline
+from read_files import create_collection
+
+
+def make_chunks(count: int, chunk_chars: int) -> List[Dict]:
+    filler = ("lorem ipsum dolor sit amet " * (chunk_chars // 27 + 1))[:chunk_chars]
+    return [
+        {
+            "file_name": f"file_{i // 100:05d}.pdf",
+            "author": f"company {i // 100 % 97}",
+            "date": "2020",
+            "region": "eu",
+            "size": 1.0,
+            "language": "latin-based",
+            "content": f"chunk {i} {filler}",
+        }
+        for i in range(count)
+    ]
+
+
+def load_fixed_size(collection, chunk_dicts: List[Dict], uuids: List[str]) -> None:
+    """The loader as it was implemented before."""
+    for i in range(0, len(chunk_dicts), 5):
+        with collection.batch.fixed_size(batch_size=5) as batch:
+            for chunk, chunk_uuid in zip(chunk_dicts[i:i+5], uuids[i:i+5]):
+                batch.add_object(properties=chunk, uuid=chunk_uuid)
+        if collection.batch.failed_objects:
+            raise RuntimeError("Failed to load some objects")
+        gc.collect()
+
+
+def timed(client, name: str, load, chunk_dicts: List[Dict]) -> Dict:
+    collection = create_collection(client, name)
+    uuids = [str(uuid.uuid4()) for _ in chunk_dicts]
+    start = time.perf_counter()
+    load(collection, chunk_dicts, uuids)
+    duration = time.perf_counter() - start
+    stored = collection.aggregate.over_all(total_count=True).total_count
+    return {
+        "seconds": round(duration, 2),
+        "chunks_per_s": round(len(chunk_dicts) / duration, 1),
+        "stored": stored,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--chunks", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--chunk-chars", type=int, default=1500)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch collection")
+    args = parser.parse_args()
+
+    client = weaviate.connect_to_local(host=args.host)
+    name = "Bench_ingest"
+    pipeline = PdfDocumentPipeline(collection_name=name)
+    pipeline.client = client
+
+    results = []
+    try:
+        for count in args.chunks:
+            chunk_dicts = make_chunks(count, args.chunk_chars)
+            results.append({
+                "chunks": count,
+                "fixed_size_5_gc": timed(client, name, load_fixed_size, chunk_dicts),
+                "dynamic": timed(
+                    client, name,
+                    lambda collection, chunks, uuids: pipeline._load_into_vdb(chunks, uuids),
+                    chunk_dicts
+                ),
+            })
+        if not args.keep:
+            client.collections.delete(name)
+    finally:
+        client.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
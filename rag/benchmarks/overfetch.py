@@ -0,0 +1,105 @@
+"""
+Benchmark over-fetch and rerank: latency and recall per overfetch factor.
+
+Sends every prompt of the prompt set to /retrieve/filter of a running API once
+per overfetch factor, i.e. searching factor x top_k candidates and reranking
+them all before keeping top_k. There are no relevance labels for the prompt
+set, so recall@k is measured against the deepest factor: the top_k that the
+reranker picks from the largest candidate pool is taken as the reference, and
+each factor's recall is the share of that reference it returned. The mean rank
+score of the returned evidences is reported too:
+
+    python benchmarks/overfetch.py --base-url http://localhost:8001 --top-k 5 \\
+        --factors 1 2 4 8 --author "Some Company"
+
+The candidates are capped by Retrieval_options.max_candidates, so raise it to
+measure larger factors. With Cascade_options enabled, only keep_ratio of the
+candidates reach the reranker and early exit can skip some of those, so run
+with the cascade disabled to measure reranking all of them, or enabled to
+measure the cascade at each factor; the report shows which one ran.
+
+Latency is only meaningful when the requests miss the caches: rerank scores
+are cached per (query, chunk) and shared across factors, so for latency run
+one factor at a time against an emptied cache database.
+"""
+from typing import Dict, List
+import argparse
+import hashlib
+import json
+import statistics
+import time
+import httpx
+
+from concurrency import percentile
+
+
+def evidence_id(evidence: Dict) -> str:
+    return hashlib.sha256(
+        (evidence["file_name"] + "\x00" + evidence["content"]).encode("utf-8")
+    ).hexdigest()
+
+
+def run_factor(client: httpx.Client, queries: List[str], params: Dict) -> Dict:
+    latencies, results, num_candidates, cascade = [], {}, None, None
+    for query in queries:
+        start = time.perf_counter()
+        response = client.get("/retrieve/filter", params={"query": query, **params})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        pdf_docs = response.json()["pdf_docs"]
+        num_candidates = pdf_docs["search"]["num_candidates"]
+        cascade = pdf_docs["artifacts"].get("cascade")
+        results[query] = {
+            evidence_id(e["evidence"]): e["rank_score"]
+            for e in pdf_docs["evidences"]
+        }
+    return {"latencies": latencies, "results": results, "num_candidates": num_candidates, "cascade": cascade}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--prompt-map", default="../data/documents/prompt_map.json")
+    parser.add_argument("--queries", nargs="*", default=[], help="extra queries besides the prompt set")
+    parser.add_argument("--author", default="")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--factors", type=float, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    with open(args.prompt_map, "r") as f:
+        queries = [p["prompt"] for p in json.load(f)] + args.queries
+
+    factors = sorted(args.factors)
+    runs = {}
+    with httpx.Client(base_url=args.base_url, timeout=args.timeout) as client:
+        for factor in factors:
+            runs[factor] = run_factor(
+                client, queries, {"author": args.author, "top_k": args.top_k, "overfetch": factor}
+            )
+
+    reference = runs[factors[-1]]["results"]
+    report = {}
+    for factor, run in runs.items():
+        recalls = [
+            len(set(run["results"][query]) & set(reference[query])) / len(reference[query])
+            for query in queries if reference[query]
+        ]
+        scores = [score for result in run["results"].values() for score in result.values()]
+        report[f"overfetch_{factor:g}"] = {
+            "num_candidates": run["num_candidates"],
+            "p50_ms": round(percentile(run["latencies"], 50) * 1000, 1),
+            "p99_ms": round(percentile(run["latencies"], 99) * 1000, 1),
+            f"recall@{args.top_k}": round(statistics.fmean(recalls), 3) if recalls else None,
+            "mean_rank_score": round(statistics.fmean(scores), 4) if scores else None,
+        }
+    print(json.dumps({
+        "queries": len(queries),
+        "reference": f"overfetch_{factors[-1]:g}",
+        "cascade": runs[factors[-1]]["cascade"],
+        "factors": report
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark the /collections/read_files listing at 1k and 10k files.
+
+Fills a scratch collection (no vectorizer) in a local Weaviate with synthetic
+chunks and times the former per-file lookup (one aggregate plus one
+fetch_objects per file) against PdfDocumentPipeline.list_files:
+
+    python benchmarks/read_files.py --files 1000 10000 --chunks-per-file 10
+"""
+from typing import Dict, List
+from pathlib import Path
+import argparse
+import json
+import sys
+import time
+import weaviate
+import weaviate.classes as wvc
+from weaviate.classes.aggregate import GroupByAggregate
+from weaviate.classes.config import Configure, Property, DataType
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "rag"))
+from lobbymap_search.etl.pipeline import PdfDocumentPipeline
+
+
+def create_collection(client, name: str):
+    if client.collections.exists(name):
+        client.collections.delete(name)
+    return client.collections.create(
+        name=name,
+        vectorizer_config=Configure.Vectorizer.none(),
+        properties=[
+            Property(name="file_name", data_type=DataType.TEXT),
+            Property(name="author", data_type=DataType.TEXT),
+            Property(name="date", data_type=DataType.TEXT),
+            Property(name="region", data_type=DataType.TEXT),
+            Property(name="size", data_type=DataType.NUMBER),
+            Property(name="language", data_type=DataType.TEXT),
+            Property(name="content", data_type=DataType.TEXT),
+        ]
+    )
+
+
+def populate(collection, files: int, chunks_per_file: int) -> None:
+    with collection.batch.fixed_size(batch_size=1000, concurrent_requests=4) as batch:
+        for f in range(files):
+            for c in range(chunks_per_file):
+                batch.add_object(properties={
+                    "file_name": f"file_{f:05d}.pdf",
+                    "author": f"company {f % 97}",
+                    "date": f"{2015 + f % 10}",
+                    "region": ["eu", "us", "uk", "au"][f % 4],
+                    "size": round(0.1 + f % 50 / 10, 2),
+                    "language": "latin-based",
+                    "content": f"chunk {c} of file {f}",
+                })
+    if collection.batch.failed_objects:
+        raise RuntimeError(f"{len(collection.batch.failed_objects)} objects failed to load")
+
+
+def list_files_per_file_lookup(collection) -> List[Dict]:
+    """The listing as it was implemented before: N+1 round trips."""
+    response = collection.aggregate.over_all(
+        group_by=GroupByAggregate(prop="file_name", limit=100000),
+        total_count=True
+    )
+    result = [
+        {"file_name": group.grouped_by.value, "num_chunks": group.total_count}
+        for group in response.groups
+    ]
+    for file in result:
+        filter_criteria = wvc.query.Filter.by_property("file_name").equal(file["file_name"])
+        properties = collection.query.fetch_objects(
+            filters=filter_criteria,
+            limit=1,
+            return_properties=["author", "date", "region", "size", "language"]
+        ).objects[0].properties
+        file.update(properties)
+    return result
+
+
+def timed(func, repeat: int) -> Dict:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        files = func()
+        durations.append(time.perf_counter() - start)
+    return {"files": len(files), "best_s": round(min(durations), 3), "mean_s": round(sum(durations) / repeat, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--files", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--chunks-per-file", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch collections")
+    args = parser.parse_args()
+
+    client = weaviate.connect_to_local(host=args.host)
+    results = []
+    try:
+        for files in args.files:
+            name = f"Bench_read_files_{files}"
+            collection = create_collection(client, name)
+            populate(collection, files, args.chunks_per_file)
+
+            pipeline = PdfDocumentPipeline(collection_name=name)
+            pipeline.client = client
+
+            results.append({
+                "files": files,
+                "chunks": files * args.chunks_per_file,
+                "per_file_lookup": timed(lambda: list_files_per_file_lookup(collection), args.repeat),
+                "single_aggregate": timed(pipeline.list_files, args.repeat),
+            })
+            if not args.keep:
+                client.collections.delete(name)
+    finally:
+        client.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+from typing import Any, Dict, List, Optional, Tuple
+from lobbymap_search.sqlite_store import SqliteStore
+import hashlib
+import json
+import time
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Hash the given parts into a fixed-size cache key.
+    """
+    raw = "\x1f".join("" if part is None else str(part) for part in parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapse whitespace so that trivially different spellings share a key.
+    """
+    return " ".join(text.split())
+
+
+class SqliteCache(SqliteStore):
+    """
+    A size-bounded key/value cache stored in a SQLite table.
+
+    Every gunicorn worker opening the same file shares the cache. Values are
+    stored as JSON, entries can carry a tag (e.g. the file they were computed
+    from) for targeted invalidation, and the least recently used entries are
+    evicted once the table grows past `max_entries`.
+    """
+
+    # Entries can be recomputed, so the last writes may be lost on power loss
+    synchronous = "NORMAL"
+
+    def __init__(
+            self,
+            path: str,
+            table: str,
+            max_entries: int = 100000,
+            ttl_seconds: Optional[float] = None
+            ):
+        super().__init__(path)
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.writes = 0
+
+        with self.transaction() as conn:
+            conn.execute(
+                f"""CREATE TABLE IF NOT EXISTS {table} (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    tag TEXT,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )"""
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_tag ON {table} (tag)")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed)")
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Look up several keys at once.
+        :param keys: The cache keys
+        :return: The cached values of the keys that were found and are not expired
+        """
+        if not keys:
+            return {}
+
+        now = time.time()
+        found = {}
+        conn = self.connection()
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT key, value, created FROM {self.table} WHERE key IN ({placeholders})",
+                batch
+            ).fetchall()
+            for key, value, created in rows:
+                if self.ttl_seconds is not None and now - created > self.ttl_seconds:
+                    continue
+                found[key] = json.loads(value)
+
+        if found:
+            with self.transaction() as conn:
+                conn.executemany(
+                    f"UPDATE {self.table} SET accessed = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+        return found
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items: List[Tuple[str, Any, Optional[str]]]) -> None:
+        """
+        Store several values at once.
+        :param items: A list of (key, value, tag) tuples
+        """
+        if not items:
+            return
+
+        now = time.time()
+        with self.transaction() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, tag, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                [(key, json.dumps(value), tag, now, now) for key, value, tag in items]
+            )
+
+        self.writes += len(items)
+        if self.writes >= max(1, self.max_entries // 100):
+            self.writes = 0
+            self.evict()
+
+    def set(self, key: str, value: Any, tag: Optional[str] = None) -> None:
+        self.set_many([(key, value, tag)])
+
+    def evict(self) -> None:
+        """
+        Drop expired entries and trim the table to `max_entries`, least recently used first.
+        """
+        with self.transaction() as conn:
+            if self.ttl_seconds is not None:
+                conn.execute(
+                    f"DELETE FROM {self.table} WHERE created < ?",
+                    (time.time() - self.ttl_seconds,)
+                )
+            count = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN "
+                    f"(SELECT key FROM {self.table} ORDER BY accessed ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def invalidate(self, tag: str) -> int:
+        """
+        Delete every entry carrying the given tag.
+        :return: The number of deleted entries
+        """
+        with self.transaction() as conn:
+            return conn.execute(f"DELETE FROM {self.table} WHERE tag = ?", (tag,)).rowcount
+
+    def clear(self) -> None:
+        with self.transaction() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+
+
+class CollectionVersion(SqliteStore):
+    """
+    A per-collection counter stored next to the caches.
+
+    Writers bump it whenever the collection changes; readers fold it into
+    their cache keys so that entries computed before the change are never
+    served again and simply age out of the cache.
+    """
+
+    def __init__(self, path: str, name: str):
+        super().__init__(path)
+        self.name = name
+
+        with self.transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS collection_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO collection_versions (name, version) VALUES (?, 0)",
+                (name,)
+            )
+
+    def get(self) -> int:
+        return self.connection().execute(
+            "SELECT version FROM collection_versions WHERE name = ?", (self.name,)
+        ).fetchone()[0]
+
+    def bump(self) -> int:
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE collection_versions SET version = version + 1 WHERE name = ?",
+                (self.name,)
+            )
+        return self.get()
+
+
+class VersionCounters(SqliteStore):
+    """
+    Named counters stored next to the caches, for versioning a part of the
+    collection (e.g. one author's documents) instead of all of it.
+
+    A counter that was never bumped is at 0. Every version also includes the
+    counter named "", which `bump_all` bumps to invalidate all names at once,
+    e.g. after a write that cannot be attributed to a name.
+    """
+
+    def __init__(self, path: str, table: str):
+        super().__init__(path)
+        self.table = table
+
+        with self.transaction() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+
+    def get(self, name: str) -> str:
+        """
+        The version of a name, combined with the version of "".
+        """
+        rows = self.connection().execute(
+            f"SELECT name, version FROM {self.table} WHERE name IN ('', ?)", (name,)
+        ).fetchall()
+        versions = {row["name"]: row["version"] for row in rows}
+        return f"{versions.get('', 0)}.{versions.get(name, 0)}"
+
+    def bump(self, names: List[str]) -> None:
+        with self.transaction() as conn:
+            conn.executemany(
+                f"""INSERT INTO {self.table} (name, version) VALUES (?, 1)
+                    ON CONFLICT (name) DO UPDATE SET version = version + 1""",
+                [(name,) for name in set(names)]
+            )
+
+    def bump_all(self) -> None:
+        self.bump([""])
@@ -0,0 +1,72 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from backend.metrics import Metrics, METRICS
+
+
+Scorer = Callable[[List[Dict]], Awaitable[List[float]]]
+
+
+async def cascade_rank(
+        candidates: List[Dict],
+        top_k: int,
+        rerank: Scorer,
+        first_stage: Optional[Scorer] = None,
+        keep_ratio: float = 0.5,
+        min_first_stage_score: Optional[float] = None,
+        step: Optional[int] = None,
+        margin: float = 0.05,
+        metrics: Metrics = METRICS
+        ) -> List[Tuple[Dict, float]]:
+    """
+    Rank the candidates of one query in two stages. A cheap first stage keeps the
+    keep_ratio most promising share of the candidates (at least top_k), then the
+    reranker scores those `step` at a time in first-stage order, and stops early
+    once a whole step scored at least `margin` below the current top_k: the top_k
+    is then considered stable.
+    :param candidates: The candidates returned by the search, with a "confidence_score"
+    :param top_k: The number of candidates to return
+    :param rerank: Scores candidates with the reranker
+    :param first_stage: Scores candidates with a cheap model, or None to use the search score;
+        candidates without one (reused from the semantic cache) keep their order
+    :param keep_ratio: The share of the candidates kept by the first stage; 1 keeps all of them
+    :param min_first_stage_score: Also drop kept candidates below top_k scoring under this, or None
+    :param step: The number of candidates per reranker call, None for top_k
+    :param margin: How far below the current top_k a whole step must score to stop
+    :return: The top_k (candidate, rank score) pairs, best first
+    """
+    # Stage 1: the search score, or a small cross-encoder
+    if first_stage is None:
+        cheap_scores = [c["confidence_score"] or 0.0 for c in candidates]
+    else:
+        cheap_scores = await first_stage(candidates)
+    order = sorted(range(len(candidates)), key=lambda i: cheap_scores[i], reverse=True)
+
+    # Always keep top_k; below that, only what passes the first-stage threshold
+    survivors = order[:max(top_k, int(len(candidates) * keep_ratio))]
+    if min_first_stage_score is not None:
+        survivors = survivors[:top_k] + [
+            i for i in survivors[top_k:] if cheap_scores[i] >= min_first_stage_score
+        ]
+
+    # Stage 2: the reranker, best first-stage candidates first
+    step = step or top_k
+    rank_scores: Dict[int, float] = {}
+    for start in range(0, len(survivors), step):
+        indices = survivors[start:start + step]
+        step_scores = await rerank([candidates[i] for i in indices])
+        rank_scores.update(zip(indices, step_scores))
+
+        # Only a full top_k can be stable, and only against a step scored after it
+        if len(rank_scores) - len(indices) >= top_k and start + step < len(survivors):
+            kth_score = sorted(rank_scores.values(), reverse=True)[top_k - 1]
+            if max(step_scores) <= kth_score - margin:
+                metrics.incr("cascade.early_exits")
+                break
+
+    metrics.incr("cascade.pruned", len(candidates) - len(survivors))
+    metrics.incr("cascade.skipped", len(survivors) - len(rank_scores))
+    metrics.incr("cascade.reranked", len(rank_scores))
+    return sorted(
+        ((candidates[i], score) for i, score in rank_scores.items()),
+        key=lambda x: x[1],
+        reverse=True
+    )[:top_k]
@@ -0,0 +1,80 @@
+from typing import List, Dict
+from collections import OrderedDict
+from ollama import AsyncClient
+from starlette.concurrency import run_in_threadpool
+from backend.cache import SqliteCache, make_key
+from backend.metrics import Metrics, METRICS
+import time
+
+
+class QueryEmbedder:
+    """
+    Embed queries through Ollama with the collection's vectorizer model.
+
+    Vectors are kept in a small in-process LRU in front of the persistent
+    SQLite cache, so repeated queries (the fixed prompt set in particular)
+    never reach Ollama. Cache misses of one call are embedded in one request.
+    """
+
+    def __init__(
+            self,
+            client: AsyncClient,
+            model: str,
+            cache: SqliteCache,
+            memory_size: int = 1024,
+            metrics: Metrics = METRICS
+            ):
+        self.client = client
+        self.model = model
+        self.cache = cache
+        self.memory_size = memory_size
+        self.memory: OrderedDict = OrderedDict()
+        self.metrics = metrics
+
+    def remember(self, key: str, vector: List[float]) -> None:
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a list of texts.
+        :param texts: The texts to embed
+        :return: One vector per text, in the same order
+        """
+        keys = [make_key(self.model, text) for text in texts]
+        vectors: Dict[str, List[float]] = {}
+
+        for key in keys:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                vectors[key] = self.memory[key]
+
+        lookup = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if lookup:
+            for key, vector in (await run_in_threadpool(self.cache.get_many, lookup)).items():
+                vectors[key] = vector
+                self.remember(key, vector)
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        self.metrics.incr("query_embedding.hits", len(set(keys)) - len(missing))
+        self.metrics.incr("query_embedding.misses", len(missing))
+
+        if missing:
+            start = time.perf_counter()
+            response = await self.client.embed(model=self.model, input=list(missing.values()))
+            self.metrics.observe("query_embedding.ollama_ms", (time.perf_counter() - start) * 1000)
+
+            for key, vector in zip(missing, response["embeddings"]):
+                vectors[key] = vector
+                self.remember(key, vector)
+            await run_in_threadpool(
+                self.cache.set_many,
+                [(key, vectors[key], None) for key in missing]
+            )
+
+        return [vectors[key] for key in keys]
+
+    async def embed_one(self, text: str) -> List[float]:
+        return (await self.embed([text]))[0]
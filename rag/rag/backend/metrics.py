@@ -0,0 +1,66 @@
+from typing import Dict
+from collections import deque
+import threading
+import time
+import os
+
+
+class Metrics:
+    """
+    In-process counters and sliding-window observations.
+
+    Each gunicorn worker keeps its own registry; the snapshot carries the pid
+    so that scrapes of different workers can be told apart.
+    """
+
+    def __init__(self, window: int = 2048):
+        self.window = window
+        self.started = time.time()
+        self.counters: Dict[str, float] = {}
+        self.observations: Dict[str, deque] = {}
+        self.lock = threading.Lock()
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        with self.lock:
+            if name not in self.observations:
+                self.observations[name] = deque(maxlen=self.window)
+            self.observations[name].append(value)
+
+    @staticmethod
+    def percentile(values, q: float) -> float:
+        values = sorted(values)
+        index = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+        return values[index]
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            counters = dict(self.counters)
+            observations = {name: list(values) for name, values in self.observations.items()}
+
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started, 1),
+            "counters": counters,
+            "hit_rates": {
+                name[:-len(".hits")]: round(hits / (hits + counters.get(name[:-len(".hits")] + ".misses", 0)), 4)
+                for name, hits in counters.items()
+                if name.endswith(".hits") and hits
+            },
+            "observations": {
+                name: {
+                    "count": len(values),
+                    "mean": round(sum(values) / len(values), 3),
+                    "p50": round(self.percentile(values, 50), 3),
+                    "p99": round(self.percentile(values, 99), 3),
+                    "max": round(max(values), 3),
+                }
+                for name, values in observations.items() if values
+            },
+        }
+
+
+METRICS = Metrics()
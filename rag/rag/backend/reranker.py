@@ -0,0 +1,137 @@
+from typing import List, Dict, Tuple
+from concurrent.futures import Executor
+from backend.metrics import Metrics, METRICS
+import asyncio
+import time
+
+
+class BatchingReranker:
+    """
+    Collect (query, evidence) pairs from concurrent requests and score them
+    with the cross-encoder in one batch.
+
+    A batch is flushed once it holds `max_batch_size` pairs or `max_wait_ms`
+    after its first request arrived, whichever comes first. Pairs are sorted
+    by length before scoring so that padding within the model's mini-batches
+    stays small, and the scores are handed back to each caller in its own order.
+    """
+
+    def __init__(
+            self,
+            model,
+            executor: Executor,
+            max_batch_size: int = 64,
+            max_wait_ms: float = 5.0,
+            metrics: Metrics = METRICS
+            ):
+        self.model = model
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.metrics = metrics
+        self.queue: asyncio.Queue = None
+        self.worker: asyncio.Task = None
+        self.flushes = set()
+
+    def start(self) -> None:
+        self.queue = asyncio.Queue()
+        self.worker = asyncio.create_task(self._collect())
+
+    async def stop(self) -> None:
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+
+    async def score(self, pairs: List[List[str]]) -> List[float]:
+        """
+        Score sentence pairs, sharing the model call with concurrent requests.
+        :param pairs: A list of [query, evidence] pairs
+        :return: The normalized rerank score of each pair
+        """
+        if not pairs:
+            return []
+        if self.worker is None:
+            self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((pairs, future, time.perf_counter()))
+        self.metrics.incr("rerank.requests")
+        self.metrics.incr("rerank.pairs", len(pairs))
+        return await future
+
+    async def rank(self, query: str, evidences: List[Dict]) -> List[float]:
+        """
+        Score each evidence against the query.
+        :param query: The query to search for
+        :param evidences: A list of evidences with a "content" field
+        :return: The rank score of each evidence
+        """
+        return await self.score([[query, evidence.get("content")] for evidence in evidences])
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            # Score this batch while the next one is being collected; the
+            # executor bounds how many batches run on the model at once.
+            flush = asyncio.create_task(self._flush(batch))
+            self.flushes.add(flush)
+            flush.add_done_callback(self.flushes.discard)
+
+    def _compute(self, pairs: List[List[str]]) -> List[float]:
+        scores = self.model.compute_score(pairs, normalize=True, batch_size=self.max_batch_size)
+        # compute_score returns a bare float for a single pair
+        if not isinstance(scores, list):
+            scores = [scores]
+        return scores
+
+    async def _flush(self, batch: List[Tuple[List[List[str]], asyncio.Future, float]]) -> None:
+        flushed_at = time.perf_counter()
+        pairs = [pair for request_pairs, _, _ in batch for pair in request_pairs]
+        order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+
+        try:
+            sorted_scores = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._compute, [pairs[i] for i in order]
+            )
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        scores = [0.0] * len(pairs)
+        for position, index in enumerate(order):
+            scores[index] = sorted_scores[position]
+
+        compute_seconds = time.perf_counter() - flushed_at
+        self.metrics.incr("rerank.batches")
+        self.metrics.observe("rerank.batch_pairs", len(pairs))
+        self.metrics.observe("rerank.batch_requests", len(batch))
+        self.metrics.observe("rerank.compute_ms", compute_seconds * 1000)
+        self.metrics.observe("rerank.pairs_per_second", len(pairs) / max(compute_seconds, 1e-9))
+
+        offset = 0
+        for request_pairs, future, queued_at in batch:
+            self.metrics.observe("rerank.queue_wait_ms", (flushed_at - queued_at) * 1000)
+            if not future.done():
+                future.set_result(scores[offset:offset + len(request_pairs)])
+            offset += len(request_pairs)
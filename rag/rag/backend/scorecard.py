@@ -0,0 +1,201 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from lobbymap_search.sqlite_store import SqliteStore
+import asyncio
+import json
+import time
+
+
+class ScorecardStore(SqliteStore):
+    """
+    The prompt x company stance matrix and the jobs that compute it, in SQLite.
+
+    Each cell holds the retrieved evidences and their stances for one
+    (prompt, author) pair, together with the fingerprint of its inputs; a job
+    only recomputes the cells whose fingerprint changed, which also lets an
+    interrupted job resume where it stopped. Jobs hold a lease renewed by a
+    heartbeat, so only one worker runs a job at a time.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        with self.transaction() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS scorecard (
+                    prompt_query TEXT NOT NULL,
+                    author TEXT NOT NULL,
+                    prompt TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    score REAL,
+                    num_evidences INTEGER NOT NULL,
+                    results TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (prompt_query, author)
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS scorecard_author ON scorecard (author)")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS scorecard_jobs (
+                    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    status TEXT NOT NULL,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    done INTEGER NOT NULL DEFAULT 0,
+                    skipped INTEGER NOT NULL DEFAULT 0,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    started_at REAL NOT NULL,
+                    heartbeat REAL NOT NULL,
+                    finished_at REAL
+                )"""
+            )
+
+    def start_job(self, lease_seconds: float) -> Optional[int]:
+        """
+        Start a job unless another one holds a live lease.
+        Jobs whose heartbeat stopped are marked as interrupted.
+        :param lease_seconds: How long a job stays alive without a heartbeat
+        :return: The id of the new job, or None if a job is already running
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            running = conn.execute(
+                "SELECT job_id FROM scorecard_jobs WHERE status = 'running' AND heartbeat > ?",
+                (now - lease_seconds,)
+            ).fetchone()
+            if running is not None:
+                return None
+
+            conn.execute(
+                "UPDATE scorecard_jobs SET status = 'interrupted', finished_at = ? WHERE status = 'running'",
+                (now,)
+            )
+            cursor = conn.execute(
+                "INSERT INTO scorecard_jobs (status, started_at, heartbeat) VALUES ('running', ?, ?)",
+                (now, now)
+            )
+            return cursor.lastrowid
+
+    def update_job(self, job_id: int, **progress: int) -> None:
+        """
+        Record the progress of a job and renew its lease.
+        """
+        columns = "".join(f", {column} = ?" for column in progress)
+        with self.transaction() as conn:
+            conn.execute(
+                f"UPDATE scorecard_jobs SET heartbeat = ?{columns} WHERE job_id = ?",
+                (time.time(), *progress.values(), job_id)
+            )
+
+    def finish_job(self, job_id: int, status: str, error: Optional[str] = None) -> None:
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                """UPDATE scorecard_jobs SET status = ?, error = ?, heartbeat = ?, finished_at = ?
+                    WHERE job_id = ?""",
+                (status, error, now, now, job_id)
+            )
+
+    def latest_job(self) -> Optional[Dict]:
+        row = self.connection().execute(
+            "SELECT * FROM scorecard_jobs ORDER BY job_id DESC LIMIT 1"
+        ).fetchone()
+        return dict(row) if row else None
+
+    def fingerprints(self) -> Dict[Tuple[str, str], str]:
+        rows = self.connection().execute(
+            "SELECT prompt_query, author, fingerprint FROM scorecard"
+        ).fetchall()
+        return {(row["prompt_query"], row["author"]): row["fingerprint"] for row in rows}
+
+    def save_cell(
+            self,
+            prompt_query: str,
+            author: str,
+            prompt: str,
+            fingerprint: str,
+            results: List[Dict]
+            ) -> None:
+        """
+        Store the evidences and stances of one (prompt, author) pair.
+        The cell's score is the mean stance of its evidences.
+        """
+        stances = [result["stance"] for result in results if result.get("stance") is not None]
+        score = sum(stances) / len(stances) if stances else None
+        with self.transaction() as conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO scorecard
+                    (prompt_query, author, prompt, fingerprint, score, num_evidences, results, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (prompt_query, author, prompt, fingerprint, score, len(results), json.dumps(results), time.time())
+            )
+
+    def remove_cells(self, prompt_queries: List[str], authors: List[str]) -> int:
+        """
+        Drop the cells of prompts or authors that no longer exist.
+        :return: The number of removed cells
+        """
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                f"""DELETE FROM scorecard
+                    WHERE prompt_query NOT IN ({",".join("?" * len(prompt_queries))})
+                    OR author NOT IN ({",".join("?" * len(authors))})""",
+                (*prompt_queries, *authors)
+            )
+            return cursor.rowcount
+
+    def cells(
+            self,
+            author: Optional[str] = None,
+            prompt_query: Optional[str] = None,
+            include_results: bool = False
+            ) -> List[Dict]:
+        conditions, params = [], []
+        if author:
+            conditions.append("author = ?")
+            params.append(author)
+        if prompt_query:
+            conditions.append("prompt_query = ?")
+            params.append(prompt_query)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        rows = self.connection().execute(
+            f"""SELECT prompt_query, author, prompt, score, num_evidences, results, updated_at
+                FROM scorecard {where} ORDER BY author, prompt_query""",
+            params
+        ).fetchall()
+
+        cells = []
+        for row in rows:
+            cell = dict(row)
+            results = json.loads(cell.pop("results"))
+            if include_results:
+                cell["results"] = results
+            cells.append(cell)
+        return cells
+
+
+async def resume_interrupted_job(
+        store: ScorecardStore,
+        lease_seconds: float,
+        start: Callable[[], Awaitable[Optional[int]]]
+        ) -> Optional[int]:
+    """
+    Resume the latest job if it did not finish, e.g. because the service restarted.
+    A job whose worker died still holds its lease until the lease expires, so the
+    resume is retried then; while a live worker renews the lease, this waits until
+    its job ends.
+    :param store: The scorecard store
+    :param lease_seconds: How long a job stays alive without a heartbeat
+    :param start: Starts a job, returning its id or None while another job holds the lease
+    :return: The id of the resumed job, or None if there was nothing to resume
+    """
+    while True:
+        job = await asyncio.to_thread(store.latest_job)
+        if job is None or job["status"] not in ("running", "interrupted"):
+            return None
+
+        job_id = await start()
+        if job_id is not None:
+            return job_id
+
+        expires_in = job["heartbeat"] + lease_seconds - time.time()
+        await asyncio.sleep(max(expires_in, 0) + 1)
@@ -0,0 +1,84 @@
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from backend.metrics import Metrics, METRICS
+import threading
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Search candidates of past queries, found again by the similarity of a new
+    query's embedding rather than by its exact text.
+
+    Entries are grouped by scope, the key of everything besides the query that
+    determines a search (filters, top_k, mode, collection version), and a
+    lookup only compares against the queries of the same scope. The candidates
+    of a hit are reranked against the new query, so only the search is
+    skipped. The index is kept in process, since a lookup scans the vectors of
+    its scope; each gunicorn worker has its own.
+    """
+
+    def __init__(
+            self,
+            threshold: float = 0.95,
+            max_entries: int = 2000,
+            metrics: Metrics = METRICS
+            ):
+        """
+        :param threshold: The minimum cosine similarity between two queries for sharing candidates
+        :param max_entries: The number of queries kept, least recently used evicted first
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.metrics = metrics
+        # (scope, query) -> candidates, least recently used first
+        self.entries: OrderedDict = OrderedDict()
+        self.scopes: Dict[str, Dict[str, np.ndarray]] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def unit(vector: List[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, scope: str, vector: List[float]) -> Optional[Tuple[str, float, List[Dict]]]:
+        """
+        Find the most similar cached query of the scope.
+        :param scope: The key of the search options besides the query
+        :param vector: The embedding of the new query
+        :return: The matched query, its similarity and its candidates, or None below the threshold
+        """
+        with self.lock:
+            queries = self.scopes.get(scope)
+            if not queries:
+                self.metrics.incr("semantic_cache.misses")
+                return None
+
+            names = list(queries)
+            similarities = np.stack([queries[name] for name in names]) @ self.unit(vector)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.metrics.incr("semantic_cache.misses")
+                return None
+
+            self.entries.move_to_end((scope, names[best]))
+            self.metrics.incr("semantic_cache.hits")
+            self.metrics.observe("semantic_cache.similarity", float(similarities[best]))
+            return names[best], float(similarities[best]), self.entries[(scope, names[best])]
+
+    def add(self, scope: str, query: str, vector: List[float], candidates: List[Dict]) -> None:
+        """
+        Remember the candidates a search returned for a query.
+        """
+        unit = self.unit(vector)
+        with self.lock:
+            self.entries[(scope, query)] = candidates
+            self.entries.move_to_end((scope, query))
+            self.scopes.setdefault(scope, {})[query] = unit
+
+            while len(self.entries) > self.max_entries:
+                (old_scope, old_query), _ = self.entries.popitem(last=False)
+                del self.scopes[old_scope][old_query]
+                if not self.scopes[old_scope]:
+                    del self.scopes[old_scope]
@@ -1,16 +1,40 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from lobbymap_search.etl.pipeline import PdfDocumentPipeline
+from fastapi.responses import StreamingResponse
+from lobbymap_search.etl.pipeline import PdfDocumentPipeline, CHUNK_PROPERTIES, QUERY_MAXIMUM_RESULTS
 import weaviate.classes as wvc
-from weaviate.classes.aggregate import GroupByAggregate
-from weaviate.classes.query import MetadataQuery
+from weaviate.classes.query import MetadataQuery, HybridFusion
+from starlette.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, List, Union
-from backend.utils import rank, generate, init_reranker
-from lobbymap_search.etl.schemas import Chunk
+import anyio.to_thread
+import anyio.from_thread
+from backend.utils import generate, generate_stream, generate_batch, init_reranker, configure_generation, load_tokenizer, CLIENT, TEMPLATE_HASH, BATCH_TEMPLATE_HASH, FAILED_STANCE_TEXT
+from backend.embedding import QueryEmbedder
+from backend.reranker import BatchingReranker
+from backend.metrics import METRICS
+from backend.scorecard import ScorecardStore, resume_interrupted_job
+from backend.semantic_cache import SemanticCache
+from backend.singleflight import SingleFlight
+from backend.cascade import cascade_rank
+from backend.cache import SqliteCache, CollectionVersion, VersionCounters, make_key, normalize_text
+from lobbymap_search.etl.schemas import Chunk, normalize_attribute
+from lobbymap_search.etl.quality import ChunkQualityGate
+from lobbymap_search.etl.catalog import DocumentCatalog
+from lobbymap_search.etl.embedder import ChunkEmbedder
 from pydantic import BaseModel
+import asyncio
+import functools
+import logging
+import random
+import time
+import json
 import yaml
 
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
 description = """
 LobbyMap Search API
 
@@ -37,6 +61,10 @@ VECTORIZER = config["Weaviate_options"]["vectorizer"]
 
 FILE_SYSTEM = config["Backend"]["file_system"]
 FILE_SYSTEM_SERVER = config["Backend"]["file_system_server"]
+PROMPT_MAP = FILE_SYSTEM + "/" + config["Backend"]["prompt_map"]
+IO_WORKERS = config["Backend"]["io_workers"]
+RERANK_WORKERS = config["Backend"]["rerank_workers"]
+EXPORT_PAGE_SIZE = config["Backend"]["export_page_size"]
 
 PARSER = config["parser_options"]["parser"]
 SAVE_PARSED_CONTENT = config["parser_options"]["save_parsed_content"]
@@ -46,12 +74,126 @@ PARSER_OPTIONS = config[config["parser_options"]["parser_options"]]
 CHUNKING_METHOD = config["Chunker"]["chunking_method"]
 CHUNKING_OPTIONS = config[config["Chunker"]["chunking_options"]]
 
+RERANKER_OPTIONS = config["Reranker_options"]
+CACHE_OPTIONS = config["Cache"]
+CATALOG_PATH = config["Catalog"]["db_path"]
+QUALITY_OPTIONS = config["Quality_options"]
+INGEST_OPTIONS = config["Ingest_options"]
+RETRIEVAL_OPTIONS = config["Retrieval_options"]
+CASCADE_OPTIONS = config["Cascade_options"]
+GENERATOR_OPTIONS = config["Generator_options"]
+SCORECARD_OPTIONS = config["Scorecard_options"]
+configure_generation(GENERATOR_OPTIONS)
+SEARCH_MODES = ["vector", "hybrid"]
+FUSION_TYPES = {
+    "relative_score": HybridFusion.RELATIVE_SCORE,
+    "ranked": HybridFusion.RANKED
+}
+
+
+# "client": chunks are embedded here in batches and inserted with their vectors;
+# "module": Weaviate's text2vec_ollama module embeds every object on insert
+chunk_embedder = None
+if INGEST_OPTIONS["embedding"] == "client":
+    chunk_embedder = ChunkEmbedder(
+        VECTORIZER,
+        host=INGEST_OPTIONS["ollama_host"],
+        batch_size=INGEST_OPTIONS["embed_batch_size"]
+    )
 
 pipeline = PdfDocumentPipeline(
     collection_name=COLLECTION_NAME,
-    vectorizer=VECTORIZER
+    vectorizer=VECTORIZER,
+    catalog=DocumentCatalog(CATALOG_PATH),
+    embedder=chunk_embedder,
+    content_tokenization=RETRIEVAL_OPTIONS["content_tokenization"]
+)
+
+quality_gate = ChunkQualityGate(**QUALITY_OPTIONS)
+
+# Rerank scores keyed by (reranker, query, chunk uuid), shared by all workers
+rerank_cache = SqliteCache(
+    CACHE_OPTIONS["db_path"],
+    "rerank_scores",
+    max_entries=CACHE_OPTIONS["rerank_max_entries"],
+    ttl_seconds=CACHE_OPTIONS["rerank_ttl_seconds"]
+)
+
+# Query vectors keyed by (vectorizer, text), so searches skip the embedding round trip
+embedder = QueryEmbedder(
+    CLIENT,
+    VECTORIZER,
+    SqliteCache(
+        CACHE_OPTIONS["db_path"],
+        "query_vectors",
+        max_entries=CACHE_OPTIONS["query_vector_max_entries"]
+    )
+)
+
+# Ranked results keyed by the normalized request and the collection version,
+# which every write to the collection bumps
+collection_version = CollectionVersion(CACHE_OPTIONS["db_path"], COLLECTION_NAME)
+result_cache = SqliteCache(
+    CACHE_OPTIONS["db_path"],
+    "retrieval_results",
+    max_entries=CACHE_OPTIONS["result_max_entries"]
 )
 
+# Identical requests in flight at the same time share one computation
+retrievals = SingleFlight("retrieval_flight")
+generations = SingleFlight("generation_flight")
+
+# Search candidates of recent queries, reused for paraphrases of them (and reranked against
+# the paraphrase); a sample of the hits is searched again to measure the quality impact
+semantic_cache = None
+if CACHE_OPTIONS["semantic_threshold"] is not None:
+    semantic_cache = SemanticCache(
+        threshold=CACHE_OPTIONS["semantic_threshold"],
+        max_entries=CACHE_OPTIONS["semantic_max_entries"]
+    )
+
+# Results of the prompt set filtered by a single author, keyed by that author's version:
+# a write only invalidates the authors it touched, which are then recomputed in the background
+author_versions = VersionCounters(CACHE_OPTIONS["db_path"], "author_versions")
+materialized_results = SqliteCache(
+    CACHE_OPTIONS["db_path"],
+    "materialized_results",
+    max_entries=CACHE_OPTIONS["materialized_max_entries"]
+)
+
+# Generated stances keyed by (generator, template, query, evidence, author); generation
+# runs at temperature 0, so an identical request gets an identical answer
+stance_cache = SqliteCache(
+    CACHE_OPTIONS["db_path"],
+    "stances",
+    max_entries=CACHE_OPTIONS["stance_max_entries"],
+    ttl_seconds=CACHE_OPTIONS["stance_ttl_seconds"]
+)
+
+
+scorecard_store = ScorecardStore(SCORECARD_OPTIONS["db_path"])
+
+
+def load_prompts() -> List[Dict]:
+    """
+    Read the fixed prompt set shared with the frontend.
+    """
+    with open(PROMPT_MAP, "r") as f:
+        return json.load(f)
+
+
+async def warm_query_vectors() -> None:
+    """
+    Embed the fixed prompt set so that its queries are served from the cache.
+    """
+    try:
+        prompts = [p["prompt"] for p in await run_in_threadpool(load_prompts)]
+        await embedder.embed(prompts)
+        logger.info(f"Pre-embedded {len(prompts)} prompts.")
+    except Exception as e:
+        logger.warning(f"Could not pre-embed the prompt set: {e}")
+
+
 ARTIFACTS = {
     "parser": {
         "model_name": PARSER,
@@ -66,16 +208,71 @@ ARTIFACTS = {
         "vectorizer_model_name": VECTORIZER,
         "reranker_model_name": RERAKER,
         "generator_model_name": GENERATOR
-    }
+    },
+    "retrieval": RETRIEVAL_OPTIONS,
+    "cascade": CASCADE_OPTIONS
 }
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: connect to Weaviate
     pipeline.connect_to_weaviate()
-    app.state.reranker = init_reranker(RERAKER)
+    pipeline.sync_catalog()
+
+    # Blocking Weaviate calls run in FastAPI's threadpool (sync endpoints and
+    # run_in_threadpool); bound it so a burst cannot exhaust the connection pool.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = IO_WORKERS
+    # The reranker gets its own executor so scoring never queues behind I/O.
+    app.state.rerank_executor = ThreadPoolExecutor(
+        max_workers=RERANK_WORKERS,
+        thread_name_prefix="reranker"
+    )
+    app.state.reranker = BatchingReranker(
+        init_reranker(RERAKER),
+        app.state.rerank_executor,
+        **RERANKER_OPTIONS
+    )
+    app.state.reranker.start()
+    # The cascade's cheap scorer: the search score, or a small cross-encoder batched like the reranker
+    app.state.first_stage = None
+    if CASCADE_OPTIONS["first_stage"] != "search":
+        app.state.first_stage = BatchingReranker(
+            init_reranker(CASCADE_OPTIONS["first_stage"]),
+            app.state.rerank_executor,
+            **RERANKER_OPTIONS
+        )
+        app.state.first_stage.start()
+    app.state.warmup = asyncio.create_task(warm_query_vectors())
+    try:
+        app.state.prompt_set = {normalize_text(p["prompt"]) for p in await run_in_threadpool(load_prompts)}
+    except Exception as e:
+        logger.warning(f"Could not load the prompt set, results will not be materialized: {e}")
+        app.state.prompt_set = set()
+    app.state.stale_authors = set()
+    app.state.audits = set()
+    app.state.materialize_task = None
+    # Load the generator's tokenizer before the first stance request needs it
+    await run_in_threadpool(load_tokenizer, GENERATOR_OPTIONS["tokenizer"])
+    # Resume a scorecard job interrupted by a restart; start_job lets one worker take it,
+    # once the lease of a job whose worker died has expired
+    app.state.scorecard_job = None
+    app.state.scorecard_resume = None
+    if SCORECARD_OPTIONS["resume_on_startup"]:
+        app.state.scorecard_resume = asyncio.create_task(resume_interrupted_job(
+            scorecard_store, SCORECARD_OPTIONS["lease_seconds"], start_scorecard_job
+        ))
     yield
     # Shutdown: close the Weaviate connection
+    if app.state.scorecard_resume is not None:
+        app.state.scorecard_resume.cancel()
+    if app.state.scorecard_job is not None:
+        app.state.scorecard_job.cancel()
+    if app.state.materialize_task is not None:
+        app.state.materialize_task.cancel()
+    await app.state.reranker.stop()
+    if app.state.first_stage is not None:
+        await app.state.first_stage.stop()
+    app.state.rerank_executor.shutdown(wait=False)
     pipeline.close()
 
 
@@ -97,8 +294,19 @@ app.add_middleware(
 )
 
 
+@app.get("/metrics")
+async def get_metrics() -> Dict:
+    """
+    Get the counters and latency observations of this worker.
+
+    Returns:
+        dict: The metrics snapshot, tagged with the worker's pid.
+    """
+    return METRICS.snapshot()
+
+
 @app.get("/collections/count")
-async def get_collections_count() -> Dict:
+def get_collections_count() -> Dict:
     """
     Get the total count of PDF documents in the collection.
 
@@ -123,12 +331,14 @@ async def get_collections_count() -> Dict:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/collections/unique")
-async def get_unique_values(attribute: str) -> Dict:
+def get_unique_values(attribute: str, limit: Optional[int] = None, offset: int = 0) -> Dict:
     """
     Get the unique values of a specified attribute within the collection.
 
     Parameters:
         attribute (str): The name of the attribute to retrieve unique values for.
+        limit (int, optional): Maximum number of values to return; all values if omitted.
+        offset (int): Number of values to skip, for paging through the values.
 
     Returns:
         dict: A dictionary with the unique values of the specified attribute and their counts.
@@ -137,31 +347,16 @@ async def get_unique_values(attribute: str) -> Dict:
         HTTPException: If the database query fails.
     """
     try:
-        # Get the collection
-        collection = pipeline.client.collections.get(COLLECTION_NAME)
+        return {attribute: pipeline.catalog.unique_values(attribute, limit=limit, offset=offset)}
 
-        # Perform an aggregate query to get unique authors
-        response = collection.aggregate.over_all(
-            group_by=GroupByAggregate(prop=attribute, limit=1000),
-            total_count=True
-        )
-
-        # Extract and format the response
-        result = [
-            {
-                attribute: group.grouped_by.value,
-                "total_count": group.total_count
-            }
-            for group in response.groups
-        ]
-
-        return {attribute: result}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/collections/count_unique")
-async def count_unique_values(attribute: str) -> Dict:
+def count_unique_values(attribute: str) -> Dict:
     """
     Get the count of unique values of a specified attribute.
 
@@ -175,22 +370,55 @@ async def count_unique_values(attribute: str) -> Dict:
         HTTPException: If the query fails.
     """
     try:
-        # Get the collection
-        collection = pipeline.client.collections.get(COLLECTION_NAME)
+        return {attribute: pipeline.catalog.count_unique(attribute)}
 
-        response = collection.aggregate.over_all(
-            group_by=GroupByAggregate(prop=attribute, limit=1000),
-            total_count=False
-        )
-        result = len(response.groups)
-        return {attribute: result}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 
+def delete_files(file_names: List[str]) -> Dict:
+    """
+    Delete the given files that exist in the collection and invalidate what was cached for them.
+
+    Parameters:
+        file_names (List[str]): The names of the files to delete.
+
+    Returns:
+        dict: The deleted file names, the names that were not found and the number of deleted chunks.
+    """
+    file_names = list(dict.fromkeys(file_names))
+    counts = pipeline.count_chunks(file_names)
+    found = [file_name for file_name in file_names if file_name in counts]
+
+    num_chunks = 0
+    if found:
+        files = [pipeline.catalog.get_file(file_name) for file_name in found]
+        try:
+            num_chunks = pipeline.delete_files(found)
+        finally:
+            for file_name in found:
+                rerank_cache.invalidate(file_name)
+            collection_version.bump()
+            if all(files):
+                authors = [f["author"] for f in files]
+                author_versions.bump(authors)
+                anyio.from_thread.run_sync(schedule_materialize, authors)
+            else:
+                # Not in the catalog, so the author is unknown
+                author_versions.bump_all()
+
+    return {
+        "deleted": found,
+        "not_found": [file_name for file_name in file_names if file_name not in counts],
+        "num_chunks": num_chunks
+    }
+
+
 @app.get("/collections/delete/file")
-async def delete_document_from_weaviate(file_name: str) -> Dict:
+def delete_document_from_weaviate(file_name: str) -> Dict:
     """
     Delete a specific document from the vector database.
 
@@ -204,25 +432,42 @@ async def delete_document_from_weaviate(file_name: str) -> Dict:
         HTTPException: If the file is not found or deletion fails.
     """
     try:
-        collection = pipeline.client.collections.get(COLLECTION_NAME)
-        count = collection.aggregate.over_all(
-            group_by=GroupByAggregate(prop="file_name", limit=1000)
-        )
-        docs = [group.grouped_by.value for group in count.groups]
-        if file_name not in docs:
+        result = delete_files([file_name])
+        if result["not_found"]:
             return {"error": "File not found."}
-
-        filter_criteria = wvc.query.Filter.by_property("file_name").equal(file_name)
-        delete_result = collection.data.delete_many(where=filter_criteria)
-        if delete_result.successful:
+        if result["num_chunks"]:
             return {"message": "File deleted successfully."}
         return {"error": "Failed to delete the file."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class DeletePayload(BaseModel):
+    file_names: List[str]
+
+
+@app.post("/collections/delete/files")
+def delete_documents_from_weaviate(payload: DeletePayload) -> Dict:
+    """
+    Delete several documents from the vector database in one call.
+
+    Parameters:
+        payload (DeletePayload): The names of the files to delete.
+
+    Returns:
+        dict: The deleted file names, the names that were not found and the number of deleted chunks.
+
+    Raises:
+        HTTPException: If the deletion fails.
+    """
+    try:
+        return delete_files(payload.file_names)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/collections/delete")
-async def delete_weaviate_collection() -> Dict:
+def delete_weaviate_collection() -> Dict:
     """
     Delete the entire collection from the vector database.
 
@@ -233,7 +478,10 @@ async def delete_weaviate_collection() -> Dict:
         HTTPException: If the deletion fails.
     """
     try:
-        pipeline.client.collections.delete(COLLECTION_NAME)
+        pipeline.delete_collection()
+        rerank_cache.clear()
+        collection_version.bump()
+        author_versions.bump_all()
         return {"message": "Collection deleted successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -258,7 +506,7 @@ async def get_collection_name() -> Dict:
 
 
 @app.get("/collections/name_all")
-async def get_collection_names() -> Dict:
+def get_collection_names() -> Dict:
     """
     Get a list of all collections in the vector database.
 
@@ -275,41 +523,19 @@ async def get_collection_names() -> Dict:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/collections/read_files")
-async def read_files_from_collection() -> Dict:
-    """
+def read_files_from_collection() -> Dict:
     """
-    try:
-        collection = pipeline.client.collections.get(COLLECTION_NAME)
+    List the files in the collection with their metadata.
 
-        # Perform an aggregate query to get unique files and their chunk counts
-        response = collection.aggregate.over_all(
-            group_by=GroupByAggregate(prop="file_name", limit=1000),
-            total_count=True
-        )
-        result = [
-            {
-                "file_name": group.grouped_by.value,
-                "num_chunks": group.total_count
-            }
-            for group in response.groups
-        ]
+    Returns:
+        dict: The files with their chunk count, author, date, region, size, language and url.
 
-        # get rest of properties for each file
+    Raises:
+        HTTPException: If the query fails.
+    """
+    try:
+        result = pipeline.catalog.list_files()
         for file in result:
-            filter_criteria = wvc.query.Filter.by_property("file_name").equal(file["file_name"])
-
-            file_properties = collection.query.fetch_objects(
-                filters=filter_criteria, 
-                limit=1,
-                return_properties=["author", "date", "region", "size", "language"] #, "upload_time"]
-                ).objects[0].properties
-
-            file["date"] = file_properties["date"]
-            file["author"] = file_properties["author"]
-            file["region"] = file_properties["region"]
-            file["size"] = file_properties["size"]
-            file["language"] = file_properties["language"]
-            # file["upload_time"] = file_properties["upload_time"]
             file["url"] = FILE_SYSTEM_SERVER + "/" +  file["file_name"]
         
         return {"files": result}
@@ -321,30 +547,207 @@ async def read_files_from_collection() -> Dict:
 
 
 
+def fetch_page(
+    filter_expr,
+    properties: List[str],
+    include_vector: bool,
+    limit: int,
+    cursor: Optional[str] = None
+    ) -> Dict:
+    """
+    Fetch one page of objects from the collection. Blocking; call it from a worker thread.
+
+    Without a filter, pages follow Weaviate's cursor API and the cursor is the uuid of
+    the last object returned. The cursor API cannot be combined with filters, so
+    filtered pages are fetched by offset and the cursor is the next offset.
+
+    Parameters:
+        filter_expr: The Weaviate filter to apply, or None.
+        properties (list): The properties to return for each object.
+        include_vector (bool): Whether to return the content vector of each object.
+        limit (int): The maximum number of objects in the page.
+        cursor (str, optional): The cursor returned with the previous page.
+
+    Returns:
+        dict: The objects of the page and the cursor of the next page, or None after the last page.
+
+    Raises:
+        ValueError: If the cursor is invalid or a filtered page lies beyond QUERY_MAXIMUM_RESULTS.
+    """
+    pdf_docs = pipeline.client.collections.get(COLLECTION_NAME)
+    vector = ["content_vector"] if include_vector else False
+
+    if filter_expr is None:
+        response = pdf_docs.query.fetch_objects(
+            limit=limit,
+            after=cursor or None,
+            return_properties=properties,
+            include_vector=vector
+        )
+    else:
+        try:
+            offset = int(cursor or 0)
+        except ValueError:
+            raise ValueError(f"Invalid cursor: {cursor}.")
+        if offset + limit > QUERY_MAXIMUM_RESULTS:
+            raise ValueError(
+                f"Filtered exports are limited to the first {QUERY_MAXIMUM_RESULTS} objects; "
+                "narrow the filter to export more."
+            )
+        response = pdf_docs.query.fetch_objects(
+            limit=limit,
+            offset=offset,
+            filters=filter_expr,
+            return_properties=properties,
+            include_vector=vector
+        )
+
+    objects = []
+    for o in response.objects:
+        obj = {"uuid": str(o.uuid), **o.properties}
+        if include_vector:
+            obj["vector"] = o.vector["content_vector"]
+        objects.append(obj)
+
+    next_cursor = None
+    if len(objects) == limit:
+        next_cursor = objects[-1]["uuid"] if filter_expr is None else str(offset + limit)
+
+    return {"objects": objects, "next_cursor": next_cursor}
+
+
+def check_properties(properties: Optional[List[str]]) -> List[str]:
+    if not properties:
+        return CHUNK_PROPERTIES
+    unknown = [prop for prop in properties if prop not in CHUNK_PROPERTIES]
+    if unknown:
+        raise ValueError(f"Invalid properties: {unknown}. Expected a subset of {CHUNK_PROPERTIES}.")
+    return properties
+
+
 @app.get("/collections/read_all")
-async def read_all_collection() -> Dict:
+def read_all_collection(
+    limit: int = EXPORT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    properties: Optional[List[str]] = Query(None),
+    include_vector: bool = False,
+    author: Optional[str] = "",
+    date: Optional[str] = "",
+    region: Optional[str] = "",
+    file_name: Optional[str] = ""
+    ) -> Dict:
     """
-    Read all documents from the collection.
+    Read the documents of the collection one page at a time.
+
+    Parameters:
+        limit (int): The maximum number of objects in the page.
+        cursor (str, optional): The "next_cursor" of the previous page; omit it for the first page.
+        properties (list, optional): The properties to return; all of them if omitted.
+        include_vector (bool): Whether to return the content vector of each object.
+        author (str, optional): Filter by author.
+        date (str, optional): Filter by date.
+        region (str, optional): Filter by region.
+        file_name (str, optional): Filter by file name.
 
     Returns:
-        dict: A dictionary containing all documents in the collection.
+        dict: The objects of the page under "all_objects" and the "next_cursor", which is None after the last page.
 
     Raises:
-        HTTPException: If the query fails.
+        HTTPException: If the parameters are invalid or the query fails.
     """
     try:
-        all_objects = []
-        pdf_docs = pipeline.client.collections.get(COLLECTION_NAME)
-        for item in pdf_docs.iterator(cache_size=50):
-            properties = item.properties
-            all_objects.append(properties)
-            
-        return {"all_objects": all_objects}
+        if not 0 < limit <= QUERY_MAXIMUM_RESULTS:
+            raise ValueError(f"limit must be between 1 and {QUERY_MAXIMUM_RESULTS}.")
+        page = fetch_page(
+            build_filters(author, date, region, file_name),
+            check_properties(properties),
+            include_vector,
+            limit,
+            cursor
+        )
+        return {"all_objects": page["objects"], "next_cursor": page["next_cursor"]}
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/collections/read_all/stream")
+def stream_all_collection(
+    properties: Optional[List[str]] = Query(None),
+    include_vector: bool = False,
+    author: Optional[str] = "",
+    date: Optional[str] = "",
+    region: Optional[str] = "",
+    file_name: Optional[str] = ""
+    ) -> StreamingResponse:
+    """
+    Stream the documents of the collection as NDJSON, one object per line.
+    Objects are fetched page by page, so memory use does not grow with the collection.
+    Filtered exports go file by file through the catalog, since filtered pages cannot
+    use the cursor API and offsets stop at QUERY_MAXIMUM_RESULTS. If the export fails
+    midway, its last line is {"error": ...}.
+
+    Parameters:
+        properties (list, optional): The properties to return; all of them if omitted.
+        include_vector (bool): Whether to return the content vector of each object.
+        author (str, optional): Filter by author.
+        date (str, optional): Filter by date.
+        region (str, optional): Filter by region.
+        file_name (str, optional): Filter by file name.
+
+    Returns:
+        StreamingResponse: The objects as newline-delimited JSON.
+
+    Raises:
+        HTTPException: If the parameters are invalid.
+    """
+    try:
+        properties = check_properties(properties)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # The catalog holds the stored, lower-cased attributes
+    author, date, region = (normalize_attribute(v) for v in (author, date, region))
+    filter_expr = build_filters(author, date, region, file_name)
+
+    def pages(page_filter):
+        cursor = None
+        while True:
+            page = fetch_page(page_filter, properties, include_vector, EXPORT_PAGE_SIZE, cursor)
+            yield page["objects"]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+    def lines():
+        try:
+            if filter_expr is None:
+                for objects in pages(None):
+                    for obj in objects:
+                        yield json.dumps(obj) + "\n"
+                return
+
+            filters = {"author": author, "date": date, "region": region, "file_name": file_name}
+            files = pipeline.catalog.list_files(**{k: v for k, v in filters.items() if v})
+            for file in files:
+                file_filter = wvc.query.Filter.all_of([
+                    filter_expr,
+                    wvc.query.Filter.by_property("file_name").equal(file["file_name"])
+                ])
+                for objects in pages(file_filter):
+                    for obj in objects:
+                        yield json.dumps(obj) + "\n"
+
+        except Exception as e:
+            # The response has already started; end it with an error line rather than a silent cut
+            logger.error(f"Export stream failed: {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 class InsertPayload(BaseModel):
     file_name: str
     chunks: List[str]
@@ -361,7 +764,36 @@ class InsertPayload(BaseModel):
 async def insert(
         payload: InsertPayload
         ) -> Dict:
-    
+    """
+    Insert the chunks of a parsed file into the collection.
+
+    Chunks that fail the quality gate (parser errors, near-empty or
+    boilerplate-only text) are not inserted.
+
+    Returns:
+        dict: The number of inserted chunks, a summary of the rejected ones and
+        the chunks that failed to load.
+
+    Raises:
+        HTTPException: 422 if no chunk passes the quality gate, 500 if the insertion fails.
+    """
+    contents, rejected = quality_gate.filter(payload.chunks)
+    rejected_summary = quality_gate.summarize(rejected)
+
+    if rejected:
+        logger.warning(
+            f"Rejected {len(rejected)}/{len(payload.chunks)} chunks of {payload.file_name}: {rejected_summary}"
+        )
+
+    if not contents:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "No chunk passed the quality gate.",
+                "file_name": payload.file_name,
+                "rejected": rejected_summary
+            }
+        )
 
     chunks = [
         Chunk(
@@ -373,18 +805,531 @@ async def insert(
             size=payload.size,
             language=payload.language
         )
-        for content in payload.chunks
+        for content in contents
     ]
 
     try:
-        pipeline.run(chunks=chunks)
+        report = await run_in_threadpool(pipeline.run, chunks=chunks)
+        # Report failures by their index in the payload, like the rejected chunks
+        rejected_indices = {entry["index"] for entry in rejected}
+        accepted_indices = [i for i in range(len(payload.chunks)) if i not in rejected_indices]
+        for entry in report["failed"]:
+            entry["index"] = accepted_indices[entry["index"]]
         return {
-            "num_chunks": len(chunks)
+            "num_chunks": report["loaded"],
+            "num_rejected": len(rejected),
+            "rejected": rejected_summary,
+            "num_failed": len(report["failed"]),
+            "failed": report["failed"]
         }
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    finally:
+        # Also after a failed run, which may have written part of the file
+        await run_in_threadpool(collection_version.bump)
+        # Chunk lower-cases the author; use the value that is stored and filtered on
+        await run_in_threadpool(author_versions.bump, [chunks[0].author])
+        schedule_materialize([chunks[0].author])
+
+
+
+def build_filters(
+    author: Optional[str] = "",
+    date: Optional[str] = "",
+    region: Optional[str] = "",
+    file_name: Optional[str] = ""
+    ):
+    """
+    Build the Weaviate filter for the given attributes.
+
+    Returns:
+        The combined filter, or None if no attribute is set.
+    """
+    # Initialize filters list
+    filters = []
+
+    # Add each filter conditionally based on provided parameters; ingest lower-cases
+    # the author, date and region, so match them in that form
+    if author:
+        filters.append(wvc.query.Filter.by_property("author").equal(normalize_attribute(author)))
+    if date:
+        filters.append(wvc.query.Filter.by_property("date").equal(normalize_attribute(date)))
+    if region:
+        filters.append(wvc.query.Filter.by_property("region").equal(normalize_attribute(region)))
+    if file_name:
+        filters.append(wvc.query.Filter.by_property("file_name").equal(file_name))
+
+    # Combine filters if there are any; use "and" to require all conditions to match
+    filter_expr = None
+    if filters:
+        filter_expr = wvc.query.Filter.all_of(filters)
+    return filter_expr
+
+
+def search(
+    vector: List[float],
+    filter_expr,
+    top_k: Union[float, int] = 5,
+    query: Optional[str] = None,
+    mode: str = "vector",
+    alpha: Optional[float] = None
+    ) -> List[Dict]:
+    """
+    Run a vector or hybrid search on the collection. Blocking; call it from a worker thread.
+
+    Parameters:
+        vector (list): The embedded query.
+        filter_expr: The Weaviate filter to apply, or None.
+        top_k (int | float): The number of results, or a certainty threshold if fractional.
+        query (str, optional): The query text, required for the BM25 part of a hybrid search.
+        mode (str): "vector" for a pure vector search, "hybrid" to fuse it with BM25.
+        alpha (float, optional): The weight of the vector search in a hybrid search, from 0 (BM25 only) to 1.
+
+    Returns:
+        list: The candidates, each with the chunk "uuid", its properties as "evidence" and its
+        "confidence_score": the certainty for vector searches, the fused score for hybrid ones.
+    """
+    pdf_docs = pipeline.client.collections.get(COLLECTION_NAME)
+    if mode == "hybrid":
+        if int(top_k) != top_k:
+            # A certainty c corresponds to a cosine distance of 2 * (1 - c)
+            limit = {"max_vector_distance": 2 * (1 - top_k)}
+        else:
+            limit = {"limit": int(top_k)}
+        response = pdf_docs.query.hybrid(
+            query=query,
+            vector=vector,
+            alpha=alpha,
+            fusion_type=FUSION_TYPES[RETRIEVAL_OPTIONS["fusion"]],
+            query_properties=["content"],
+            target_vector="content_vector",
+            filters=filter_expr,
+            return_metadata=MetadataQuery(score=True),
+            **limit
+        )
+        return [
+            {
+                "uuid": str(o.uuid),
+                "evidence": o.properties,
+                "confidence_score": o.metadata.score
+            }
+            for o in response.objects
+        ]
+
+    if int(top_k) != top_k:
+        response = pdf_docs.query.near_vector(
+            near_vector=vector,
+            certainty=top_k,
+            filters=filter_expr,
+            target_vector="content_vector",
+            return_metadata=MetadataQuery(
+                certainty=True,
+                )
+        )
+    else:
+        response = pdf_docs.query.near_vector(
+            near_vector=vector,
+            limit=int(top_k),
+            filters=filter_expr,
+            target_vector="content_vector",
+            return_metadata=MetadataQuery(
+                certainty=True,
+                )
+        )
+
+    return [
+        {
+            "uuid": str(o.uuid),
+            "evidence": o.properties,
+            "confidence_score": o.metadata.certainty
+        }
+        for o in response.objects
+    ]
+
+
+async def rank_candidates_many(
+    queries: List[str],
+    candidate_lists: List[List[Dict]],
+    model_name: str = RERAKER
+    ) -> List[List[float]]:
+    """
+    Rerank the candidates of several queries, reusing cached scores and scoring
+    all uncached pairs in one batched reranker call.
+
+    Parameters:
+        queries (list): The query strings.
+        candidate_lists (list): For each query, the candidates returned by `search`.
+        model_name (str): The reranker, or the cascade's first-stage cross-encoder.
+
+    Returns:
+        list: For each query, the rank score of each of its candidates.
+    """
+    reranker = app.state.reranker if model_name == RERAKER else app.state.first_stage
+    keys = [
+        [make_key(model_name, normalize_text(query), c["uuid"]) for c in candidates]
+        for query, candidates in zip(queries, candidate_lists)
+    ]
+    cached = await run_in_threadpool(rerank_cache.get_many, [key for ks in keys for key in ks])
+
+    scores = [[cached.get(key) for key in ks] for ks in keys]
+    missing = [
+        (q, i)
+        for q, ks in enumerate(keys)
+        for i, key in enumerate(ks)
+        if key not in cached
+    ]
+    METRICS.incr("rerank_cache.hits", sum(len(ks) for ks in keys) - len(missing))
+    METRICS.incr("rerank_cache.misses", len(missing))
+
+    if missing:
+        new_scores = await reranker.score([
+            [queries[q], candidate_lists[q][i]["evidence"].get("content")]
+            for q, i in missing
+        ])
+        for (q, i), score in zip(missing, new_scores):
+            scores[q][i] = score
+
+        await run_in_threadpool(
+            rerank_cache.set_many,
+            [
+                (keys[q][i], scores[q][i], candidate_lists[q][i]["evidence"].get("file_name"))
+                for q, i in missing
+            ]
+        )
+    return scores
+
+
+async def rank_candidates(query: str, candidates: List[Dict], model_name: str = RERAKER) -> List[float]:
+    """
+    Rerank the candidates against the query, reusing cached scores.
+
+    Parameters:
+        query (str): The query string.
+        candidates (list): The candidates returned by `search`.
+        model_name (str): The reranker, or the cascade's first-stage cross-encoder.
+
+    Returns:
+        list: The rank score of each candidate.
+    """
+    return (await rank_candidates_many([query], [candidates], model_name))[0]
+
+
+def search_options(mode: Optional[str], alpha: Optional[float]):
+    """
+    Resolve the search mode and alpha of a request against the configured defaults.
+
+    Raises:
+        ValueError: If the mode is unknown or alpha is outside [0, 1].
+    """
+    mode = mode or RETRIEVAL_OPTIONS["mode"]
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Invalid mode: {mode}. Expected one of {SEARCH_MODES}.")
+    if mode == "vector":
+        return mode, None
+
+    alpha = RETRIEVAL_OPTIONS["alpha"] if alpha is None else alpha
+    if not 0 <= alpha <= 1:
+        raise ValueError("alpha must be between 0 and 1.")
+    return mode, float(alpha)
+
+
+def candidate_budget(top_k: Union[float, int], overfetch: Optional[float]) -> Union[float, int]:
+    """
+    The number of candidates to search for and rerank: overfetch times top_k, so that the
+    reranker can promote chunks the search ranked just below top_k, capped by
+    max_candidates to bound the rerank cost. A fractional top_k (a certainty threshold)
+    is returned as is, since the search already returns every chunk above it.
+
+    Raises:
+        ValueError: If overfetch is below 1.
+    """
+    overfetch = RETRIEVAL_OPTIONS["overfetch_factor"] if overfetch is None else overfetch
+    if overfetch < 1:
+        raise ValueError("overfetch must be at least 1.")
+    if int(top_k) != top_k:
+        return top_k
+    top_k = int(top_k)
+    return max(top_k, min(int(top_k * overfetch), RETRIEVAL_OPTIONS["max_candidates"], QUERY_MAXIMUM_RESULTS))
+
+
+async def retrieve_many(
+    queries: List[str],
+    author: Optional[str] = "",
+    date: Optional[str] = "",
+    region: Optional[str] = "",
+    file_name: Optional[str] = "",
+    top_k: Union[float, int] = 5,
+    mode: Optional[str] = None,
+    alpha: Optional[float] = None,
+    overfetch: Optional[float] = None
+    ) -> List[List[Dict]]:
+    """
+    Search and rerank several queries with shared filters, serving identical
+    requests from the result cache and joining an identical request in flight.
+    The search mode, alpha and overfetch factor default to the configured retrieval options.
+
+    Returns:
+        list: For each query, the evidences with their confidence and rank scores, best first.
+        The confidence score is None for candidates reused from the semantic cache.
+    """
+    # Match the stored, lower-cased attributes, so that "Chevron" shares the
+    # cache entries and the author version of "chevron"
+    author, date, region = (normalize_attribute(v) for v in (author, date, region))
+    mode, alpha = search_options(mode, alpha)
+    num_candidates = candidate_budget(top_k, overfetch)
+
+    # Author-only requests with the default options are materialized per author;
+    # the others are cached until the next write to the collection
+    materialized = (
+        bool(author) and not (date or region or file_name)
+        and top_k in CACHE_OPTIONS["materialized_top_ks"]
+        and (mode, alpha) == search_options(None, None)
+        and num_candidates == candidate_budget(top_k, None)
+    )
+    if materialized:
+        version = await run_in_threadpool(author_versions.get, author)
+    else:
+        version = await run_in_threadpool(collection_version.get)
+
+    # The version is part of the key, so a request made after a write never
+    # joins a computation that started before it
+    key = make_key(
+        version,
+        *(normalize_text(query) for query in queries),
+        author or "", date or "", region or "", file_name or "",
+        float(top_k), float(num_candidates), mode, alpha
+    )
+    return await retrievals.do(
+        key,
+        lambda: compute_retrievals(
+            queries, author, date, region, file_name, top_k, num_candidates, mode, alpha,
+            version, materialized
+        )
+    )
+
+
+async def compute_retrievals(
+    queries: List[str],
+    author: Optional[str],
+    date: Optional[str],
+    region: Optional[str],
+    file_name: Optional[str],
+    top_k: Union[float, int],
+    num_candidates: Union[float, int],
+    mode: str,
+    alpha: Optional[float],
+    version: Union[int, str],
+    materialized: bool
+    ) -> List[List[Dict]]:
+    """
+    The work behind `retrieve_many`: the uncached queries are embedded in one
+    call, searched concurrently for num_candidates candidates each and reranked
+    in one batched call, keeping the top_k best. Results are cached under the
+    given collection or author version.
+    """
+    keys = [
+        make_key(
+            version,
+            normalize_text(query),
+            author or "", date or "", region or "", file_name or "",
+            float(top_k), float(num_candidates),
+            mode, alpha, RETRIEVAL_OPTIONS["fusion"],
+            json.dumps(CASCADE_OPTIONS, sort_keys=True)
+        )
+        for query in queries
+    ]
+    is_materialized = [materialized and normalize_text(query) in app.state.prompt_set for query in queries]
+
+    results = await run_in_threadpool(
+        materialized_results.get_many, [key for key, m in zip(keys, is_materialized) if m]
+    )
+    METRICS.incr("materialized.hits", len(results))
+    METRICS.incr("materialized.misses", sum(is_materialized) - len(results))
+    results.update(await run_in_threadpool(
+        result_cache.get_many, [key for key, m in zip(keys, is_materialized) if not m]
+    ))
+
+    # One search per distinct uncached request
+    missing = {key: query for key, query in zip(keys, queries) if key not in results}
+    materialized_keys = {key for key, m in zip(keys, is_materialized) if m}
+    METRICS.incr("result_cache.hits", len(queries) - len(missing))
+    METRICS.incr("result_cache.misses", len(missing))
+
+    if missing:
+        filter_expr = build_filters(author, date, region, file_name)
+        missing_queries = list(missing.values())
+
+        vectors = await embedder.embed(missing_queries)
+
+        # Everything but the query that determines a search
+        scope = make_key(
+            version,
+            author or "", date or "", region or "", file_name or "",
+            float(num_candidates),
+            mode, alpha, RETRIEVAL_OPTIONS["fusion"]
+        )
+
+        async def find_candidates(key: str, query: str, vector: List[float]) -> List[Dict]:
+            # Materialized prompts are always searched, so they never drift from their exact results
+            if semantic_cache is not None and key not in materialized_keys:
+                hit = semantic_cache.lookup(scope, vector)
+                if hit is not None:
+                    if random.random() < CACHE_OPTIONS["semantic_audit_rate"]:
+                        audit = asyncio.create_task(audit_semantic_hit(
+                            scope, query, vector, hit, filter_expr, num_candidates, mode, alpha
+                        ))
+                        app.state.audits.add(audit)
+                        audit.add_done_callback(app.state.audits.discard)
+                    # The search scores were computed for the matched query, not this one;
+                    # the reranker scores the candidates against this query below
+                    return [{**candidate, "confidence_score": None} for candidate in hit[2]]
+
+            # Query the Vector DB with the constructed filters
+            candidates = await run_in_threadpool(search, vector, filter_expr, num_candidates, query, mode, alpha)
+            if semantic_cache is not None:
+                semantic_cache.add(scope, normalize_text(query), vector, candidates)
+            return candidates
+
+        candidate_lists = await asyncio.gather(*(
+            find_candidates(key, query, vector)
+            for (key, query), vector in zip(missing.items(), vectors)
+        ))
+
+        # Over-fetched candidates are reranked, then cut back to top_k
+        keep = int(top_k) if int(top_k) == top_k else None
+        if keep is not None and CASCADE_OPTIONS["enabled"]:
+            ranked_lists = await asyncio.gather(*(
+                cascade_rank(
+                    candidates,
+                    keep,
+                    rerank=functools.partial(rank_candidates, query),
+                    first_stage=(
+                        None if app.state.first_stage is None
+                        else functools.partial(rank_candidates, query, model_name=CASCADE_OPTIONS["first_stage"])
+                    ),
+                    keep_ratio=CASCADE_OPTIONS["keep_ratio"],
+                    min_first_stage_score=CASCADE_OPTIONS["min_first_stage_score"],
+                    step=CASCADE_OPTIONS["step"],
+                    margin=CASCADE_OPTIONS["margin"]
+                )
+                for query, candidates in zip(missing_queries, candidate_lists)
+            ))
+        else:
+            rank_score_lists = await rank_candidates_many(missing_queries, candidate_lists)
+            ranked_lists = [
+                sorted(zip(candidates, rank_scores), key=lambda x: x[1], reverse=True)[:keep]
+                for candidates, rank_scores in zip(candidate_lists, rank_score_lists)
+            ]
+
+        for key, ranked in zip(missing, ranked_lists):
+            results[key] = [
+                {
+                    "evidence": candidate["evidence"],
+                    "confidence_score": candidate["confidence_score"],
+                    "rank_score": rank_score
+                }
+                for candidate, rank_score in ranked
+            ]
+
+        await run_in_threadpool(
+            materialized_results.set_many,
+            [(key, results[key], author) for key in missing if key in materialized_keys]
+        )
+        await run_in_threadpool(
+            result_cache.set_many,
+            [(key, results[key], None) for key in missing if key not in materialized_keys]
+        )
+
+    return [results[key] for key in keys]
+
+
+async def audit_semantic_hit(
+    scope: str,
+    query: str,
+    vector: List[float],
+    hit,
+    filter_expr,
+    num_candidates: Union[float, int],
+    mode: str,
+    alpha: Optional[float]
+    ) -> None:
+    """
+    Measure what a semantic cache hit cost in quality: search the query for real
+    and record the share of its candidates that the reused candidates contained.
+    The real candidates then replace the query's entry in the semantic cache.
+    """
+    matched_query, similarity, cached_candidates = hit
+    try:
+        candidates = await run_in_threadpool(search, vector, filter_expr, num_candidates, query, mode, alpha)
+    except Exception as e:
+        logger.warning(f"Could not audit the semantic cache hit of {query!r}: {e}")
+        return
+
+    cached_uuids = {c["uuid"] for c in cached_candidates}
+    overlap = (
+        sum(c["uuid"] in cached_uuids for c in candidates) / len(candidates)
+        if candidates else float(not cached_candidates)
+    )
+    METRICS.observe("semantic_cache.audit_overlap", overlap)
+    if overlap < CACHE_OPTIONS["semantic_min_overlap"]:
+        METRICS.incr("semantic_cache.audit_failures")
+        logger.warning(
+            f"Semantic cache hit of {query!r} on {matched_query!r} (similarity {similarity:.4f}) "
+            f"shared only {overlap:.0%} of the candidates."
+        )
+    semantic_cache.add(scope, normalize_text(query), vector, candidates)
+
+
+def schedule_materialize(authors: List[str]) -> None:
+    """
+    Queue the authors whose documents changed for recomputing their materialized results.
+    Must run on the event loop; from a worker thread, go through anyio.from_thread.run_sync.
+    """
+    app.state.stale_authors.update(author for author in authors if author)
+    if app.state.stale_authors and (app.state.materialize_task is None or app.state.materialize_task.done()):
+        app.state.materialize_task = asyncio.create_task(materialize_stale_authors())
+
+
+async def materialize_stale_authors() -> None:
+    """
+    Recompute the results of the prompt set for every queued author, one author at a time.
+    Waits a little first so that a burst of inserts for one author is recomputed once.
+    """
+    await asyncio.sleep(CACHE_OPTIONS["materialized_refresh_delay_seconds"])
+    prompts = [p["prompt"] for p in await run_in_threadpool(load_prompts)]
+    while app.state.stale_authors:
+        author = app.state.stale_authors.pop()
+        start = time.perf_counter()
+        try:
+            for top_k in CACHE_OPTIONS["materialized_top_ks"]:
+                await retrieve_many(prompts, author=author, top_k=top_k)
+            METRICS.observe("materialized.refresh_ms", (time.perf_counter() - start) * 1000)
+            logger.info(f"Materialized {len(prompts)} prompts for {author} in {time.perf_counter() - start:.2f}s.")
+        except Exception as e:
+            logger.error(f"Could not materialize the results of {author}: {e}")
+
+
+async def retrieve(
+    query: str,
+    author: Optional[str] = "",
+    date: Optional[str] = "",
+    region: Optional[str] = "",
+    file_name: Optional[str] = "",
+    top_k: Union[float, int] = 5,
+    mode: Optional[str] = None,
+    alpha: Optional[float] = None,
+    overfetch: Optional[float] = None
+    ) -> List[Dict]:
+    """
+    Search and rerank one query, serving identical requests from the result cache.
+
+    Returns:
+        list: The evidences with their confidence and rank scores, best first.
+        The confidence score is None for candidates reused from the semantic cache.
+    """
+    return (await retrieve_many([query], author, date, region, file_name, top_k, mode, alpha, overfetch))[0]
 
 
 @app.get("/retrieve/filter")
@@ -394,7 +1339,10 @@ async def run_filter_query(
     date: Optional[str] = "", 
     region: Optional[str] = "",
     file_name: Optional[str] = "",
-    top_k: Optional[Union[float, int]] = 5
+    top_k: Optional[Union[float, int]] = 5,
+    mode: Optional[str] = None,
+    alpha: Optional[float] = None,
+    overfetch: Optional[float] = None
     ):
     """
     Run a filtered query on the collection.
@@ -406,6 +1354,10 @@ async def run_filter_query(
         region (str, optional): Filter by region.
         file_name (str, optional): Filter by file name.
         top_k (int, optional): Number of top results to return (default: 5).
+        mode (str, optional): "vector" or "hybrid" (BM25 + vector); the configured mode if omitted.
+        alpha (float, optional): The weight of the vector search in hybrid mode; the configured alpha if omitted.
+        overfetch (float, optional): Search overfetch x top_k candidates (up to max_candidates) and
+            rerank them all; the configured factor if omitted.
 
     Returns:
         dict: A dictionary containing ranked evidence filtered by the specified attributes.
@@ -414,73 +1366,13 @@ async def run_filter_query(
         HTTPException: If the query or filtering fails.
     """
     try:
-        # Initialize filters list
-        filters = []
-
-        # Add each filter conditionally based on provided parameters
-        if author:
-            filters.append(wvc.query.Filter.by_property("author").equal(author))
-        if date:
-            filters.append(wvc.query.Filter.by_property("date").equal(date))
-        if region:
-            filters.append(wvc.query.Filter.by_property("region").equal(region))
-        if file_name:
-            filters.append(wvc.query.Filter.by_property("file_name").equal(file_name))
-
-        # Combine filters if there are any; use "and" to require all conditions to match
-        filter_expr = None
-        if filters:
-            filter_expr = wvc.query.Filter.all_of(filters)
-
-        # Query the Vector DB with the constructed filters
-        pdf_docs = pipeline.client.collections.get(COLLECTION_NAME)
-        if int(top_k) != top_k:
-            response = pdf_docs.query.near_text(
-                query=query,
-                certainty=top_k,
-                filters=filter_expr,
-                target_vector="content_vector",
-                return_metadata=MetadataQuery(
-                    certainty=True,
-                    )
-            )
-        else:
-            response = pdf_docs.query.near_text(
-                query=query,
-                limit=int(top_k),
-                filters=filter_expr,
-                target_vector="content_vector",
-                return_metadata=MetadataQuery(
-                    certainty=True,
-                    )
-            )
-
-        confidence_scores: List[float] = []
-        evidences: List[Dict] = []
-
-        for o in response.objects:
-            confidence_score = o.metadata.certainty
-            evidence = o.properties
-
-            confidence_scores.append(confidence_score)
-            evidences.append(evidence)
-
-        reranker_model = app.state.reranker
-        rank_scores = rank(reranker_model, query, evidences)
-
-        ranked_evidences = [
-            {
-                "evidence": i,
-                "confidence_score": j,
-                "rank_score": k
-            }
+        mode, alpha = search_options(mode, alpha)
+        num_candidates = candidate_budget(top_k, overfetch)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-            for i, j, k in sorted(
-                zip(evidences, confidence_scores, rank_scores),
-                key=lambda x: x[2],
-                reverse=True
-            )
-        ]
+    try:
+        ranked_evidences = await retrieve(query, author, date, region, file_name, top_k, mode, alpha, overfetch)
 
         return {
             "pdf_docs": {
@@ -490,7 +1382,10 @@ async def run_filter_query(
                     "date": date,
                     "region": region,
                     "file_name": file_name,
-                    "top_k": top_k
+                    "top_k": top_k,
+                    "mode": mode,
+                    "alpha": alpha,
+                    "num_candidates": num_candidates
                 },
                 "artifacts": ARTIFACTS,
                 "evidences": ranked_evidences
@@ -501,17 +1396,100 @@ async def run_filter_query(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class BatchRetrievePayload(BaseModel):
+    queries: List[str]
+    author: Optional[str] = ""
+    date: Optional[str] = ""
+    region: Optional[str] = ""
+    file_name: Optional[str] = ""
+    top_k: Optional[Union[float, int]] = 5
+    mode: Optional[str] = None
+    alpha: Optional[float] = None
+    overfetch: Optional[float] = None
+
+
+@app.post("/retrieve/batch")
+async def run_batch_query(payload: BatchRetrievePayload) -> Dict:
+    """
+    Run several queries with the same filters in one call, e.g. the whole prompt set.
+    The queries are embedded together, searched concurrently and reranked in one batch.
+
+    Parameters:
+        payload (BatchRetrievePayload): The queries and the filters, top_k, mode, alpha and overfetch shared by all of them.
+
+    Returns:
+        dict: Under "results", one /retrieve/filter response per query, in the order of the queries.
+
+    Raises:
+        HTTPException: If the options are invalid or the retrieval fails.
+    """
+    try:
+        mode, alpha = search_options(payload.mode, payload.alpha)
+        num_candidates = candidate_budget(payload.top_k, payload.overfetch)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        ranked_evidence_lists = await retrieve_many(
+            payload.queries,
+            payload.author,
+            payload.date,
+            payload.region,
+            payload.file_name,
+            payload.top_k,
+            mode,
+            alpha,
+            payload.overfetch
+        )
+
+        return {
+            "results": [
+                {
+                    "pdf_docs": {
+                        "search": {
+                            "query": query,
+                            "author": payload.author,
+                            "date": payload.date,
+                            "region": payload.region,
+                            "file_name": payload.file_name,
+                            "top_k": payload.top_k,
+                            "mode": mode,
+                            "alpha": alpha,
+                            "num_candidates": num_candidates
+                        },
+                        "artifacts": ARTIFACTS,
+                        "evidences": ranked_evidences
+                    }
+                }
+                for query, ranked_evidences in zip(payload.queries, ranked_evidence_lists)
+            ]
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+
+def stance_key(template_hash: str, query: str, evidence: str, author: Optional[str]) -> str:
+    # The generation options change the answers too (token caps, structured output)
+    return make_key(
+        GENERATOR, template_hash, json.dumps(GENERATOR_OPTIONS, sort_keys=True),
+        query, evidence, author or ""
+    )
 
 
 @app.get("/generate/stance")
-async def generate_stance(query: str, evidence: str, author: Optional[str] = None) -> Dict:
+async def generate_stance(query: str, evidence: str, author: Optional[str] = None, refresh: bool = False) -> Dict:
     """
     Generate a stance based on a query and evidence.
+    Stances are cached; identical requests are answered without calling the LLM.
 
     Parameters:
         query (str): The query string.
         evidence (str): The evidence string.
         metadata (dict, optional): Additional metadata for the generation process.
+        refresh (bool): Generate the stance again instead of reading it from the cache.
 
     Returns:
         dict: A dictionary containing the stance score and reason.
@@ -520,12 +1498,24 @@ async def generate_stance(query: str, evidence: str, author: Optional[str] = Non
         HTTPException: If the generation process fails.
     """
     try:
-        generated_stance = generate(
-            GENERATOR, 
-            evidence, 
-            query, 
-            author
-            )
+        key = stance_key(TEMPLATE_HASH, query, evidence, author)
+        generated_stance = None
+        if not refresh:
+            generated_stance = await run_in_threadpool(stance_cache.get, key)
+            METRICS.incr("stance_cache.misses" if generated_stance is None else "stance_cache.hits")
+
+        if generated_stance is None:
+            generated_stance = await generations.do(
+                key,
+                lambda: generate(
+                    GENERATOR,
+                    evidence,
+                    query,
+                    author
+                    )
+                )
+            if generated_stance["stance_text"] != FAILED_STANCE_TEXT:
+                await run_in_threadpool(stance_cache.set, key, generated_stance)
         
         return {
             "stance": generated_stance["score"],
@@ -537,4 +1527,336 @@ async def generate_stance(query: str, evidence: str, author: Optional[str] = Non
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def sse_event(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.get("/generate/stance/stream")
+async def stream_stance(query: str, evidence: str, author: Optional[str] = None, refresh: bool = False) -> StreamingResponse:
+    """
+    Generate a stance like /generate/stance, streaming the model's output as Server-Sent Events.
 
+    Parameters:
+        query (str): The query string.
+        evidence (str): The evidence string.
+        author (str, optional): The company in question.
+        refresh (bool): Generate the stance again instead of reading it from the cache.
+
+    Returns:
+        StreamingResponse: "token" events with the generated text as it is produced, then one
+        "result" event with the stance, stance_text and stance_score, or an "error" event.
+    """
+    key = stance_key(TEMPLATE_HASH, query, evidence, author)
+
+    async def events():
+        start = time.perf_counter()
+        first = True
+
+        def mark_first_byte():
+            nonlocal first
+            if first:
+                METRICS.observe("stance_stream.ttfb_ms", (time.perf_counter() - start) * 1000)
+                first = False
+
+        try:
+            generated_stance = None
+            if not refresh:
+                generated_stance = await run_in_threadpool(stance_cache.get, key)
+                METRICS.incr("stance_cache.misses" if generated_stance is None else "stance_cache.hits")
+
+            if generated_stance is None:
+                async for event, data in generate_stream(GENERATOR, evidence, query, author):
+                    if event == "result":
+                        generated_stance = data
+                        continue
+                    mark_first_byte()
+                    yield sse_event(event, data)
+
+                if generated_stance["stance_text"] != FAILED_STANCE_TEXT:
+                    await run_in_threadpool(stance_cache.set, key, generated_stance)
+
+            mark_first_byte()
+            yield sse_event("result", {
+                "stance": generated_stance["score"],
+                "stance_text": generated_stance["stance_text"],
+                "stance_score": 0.0
+            })
+            METRICS.observe("stance_stream.total_ms", (time.perf_counter() - start) * 1000)
+
+        except Exception as e:
+            logger.error(f"Failed to stream the stance: {e}")
+            mark_first_byte()
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def generate_stances_cached(
+    query: str,
+    evidences: List[str],
+    author: Optional[str] = None,
+    refresh: bool = False
+    ) -> List[Dict]:
+    """
+    Generate the stance of several evidences, reusing cached stances unless
+    refresh is set and batching the others into as few LLM calls as possible.
+
+    Returns:
+        list: One {"score", "stance_text"} per evidence, in the same order.
+    """
+    keys = [
+        stance_key(BATCH_TEMPLATE_HASH, query, evidence, author)
+        for evidence in evidences
+    ]
+    cached = {}
+    if not refresh:
+        cached = await run_in_threadpool(stance_cache.get_many, keys)
+
+    missing = {key: evidence for key, evidence in zip(keys, evidences) if key not in cached}
+    METRICS.incr("stance_cache.hits", len(set(keys)) - len(missing))
+    METRICS.incr("stance_cache.misses", len(missing))
+
+    if missing:
+        new_stances = await generations.do(
+            make_key(*missing),
+            lambda: generate_batch(
+                GENERATOR,
+                list(missing.values()),
+                query,
+                author,
+                token_budget=GENERATOR_OPTIONS["batch_token_budget"],
+                max_evidences=GENERATOR_OPTIONS["max_batch_evidences"]
+            )
+        )
+        cached.update(zip(missing, new_stances))
+        await run_in_threadpool(
+            stance_cache.set_many,
+            [
+                (key, stance, None)
+                for key, stance in zip(missing, new_stances)
+                if stance["stance_text"] != FAILED_STANCE_TEXT
+            ]
+        )
+
+    return [cached[key] for key in keys]
+
+
+class StancesPayload(BaseModel):
+    query: str
+    evidences: List[str]
+    author: Optional[str] = None
+    refresh: bool = False
+
+
+@app.post("/generate/stances")
+async def generate_stances(payload: StancesPayload) -> Dict:
+    """
+    Generate the stance of several evidences on a query, packing them into as few LLM calls as possible.
+    Cached stances are reused unless refresh is set; only the others are generated.
+
+    Parameters:
+        payload (StancesPayload): The query, the evidence texts, optionally the company in question
+            and whether to bypass the cache.
+
+    Returns:
+        dict: Under "stances", one {"stance", "stance_text", "stance_score"} per evidence, in the same order.
+
+    Raises:
+        HTTPException: If the generation process fails.
+    """
+    try:
+        generated_stances = await generate_stances_cached(
+            payload.query, payload.evidences, payload.author, payload.refresh
+        )
+
+        return {
+            "stances": [
+                {
+                    "stance": generated_stance["score"],
+                    "stance_text": generated_stance["stance_text"],
+                    "stance_score": 0.0
+                }
+                for generated_stance in generated_stances
+            ]
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def scorecard_fingerprint(prompt: str, author_fingerprint: str) -> str:
+    """
+    Everything a scorecard cell depends on: the prompt, the author's documents
+    and the models, templates and options used to retrieve and generate.
+    """
+    return make_key(
+        prompt, author_fingerprint, RERAKER, VECTORIZER,
+        stance_key(BATCH_TEMPLATE_HASH, "", "", ""),
+        json.dumps(RETRIEVAL_OPTIONS, sort_keys=True),
+        json.dumps(CASCADE_OPTIONS, sort_keys=True),
+        SCORECARD_OPTIONS["top_k"]
+    )
+
+
+async def score_cell(prompt: Dict, author: str) -> List[Dict]:
+    """
+    Retrieve the evidences of one (prompt, author) pair and generate their stances.
+    """
+    ranked_evidences = await retrieve(prompt["prompt"], author=author, top_k=SCORECARD_OPTIONS["top_k"])
+    stances = await generate_stances_cached(
+        prompt["prompt"],
+        [e["evidence"]["content"] for e in ranked_evidences],
+        author
+    )
+    return [
+        {
+            "file_name": e["evidence"].get("file_name"),
+            "content": e["evidence"].get("content"),
+            "rank_score": e["rank_score"],
+            "stance": stance["score"],
+            "stance_text": stance["stance_text"]
+        }
+        for e, stance in zip(ranked_evidences, stances)
+    ]
+
+
+async def run_scorecard_job(job_id: int, force: bool = False) -> None:
+    """
+    Compute every (prompt, author) cell whose inputs changed since it was stored,
+    with at most SCORECARD_OPTIONS["concurrency"] cells in flight. Each cell is
+    saved as soon as it is done, so an interrupted job resumes where it stopped.
+    """
+    progress = {"total": 0, "done": 0, "skipped": 0, "failed": 0}
+
+    async def heartbeat():
+        while True:
+            await asyncio.sleep(SCORECARD_OPTIONS["lease_seconds"] / 3)
+            await run_in_threadpool(scorecard_store.update_job, job_id, **progress)
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    try:
+        prompts = await run_in_threadpool(load_prompts)
+        author_fingerprints = await run_in_threadpool(pipeline.catalog.author_fingerprints)
+        authors = [author for author in author_fingerprints if author]
+        removed = await run_in_threadpool(
+            scorecard_store.remove_cells, [p["query"] for p in prompts], authors
+        )
+        if removed:
+            logger.info(f"Removed {removed} scorecard cells of deleted prompts or authors.")
+
+        stored = await run_in_threadpool(scorecard_store.fingerprints)
+        cells = []
+        for prompt in prompts:
+            for author in authors:
+                fingerprint = scorecard_fingerprint(prompt["prompt"], author_fingerprints[author])
+                if force or stored.get((prompt["query"], author)) != fingerprint:
+                    cells.append((prompt, author, fingerprint))
+        progress["total"] = len(prompts) * len(authors)
+        progress["skipped"] = progress["total"] - len(cells)
+        logger.info(f"Scorecard job {job_id}: {len(cells)} of {progress['total']} cells to compute.")
+
+        semaphore = asyncio.Semaphore(SCORECARD_OPTIONS["concurrency"])
+
+        async def compute(prompt: Dict, author: str, fingerprint: str):
+            async with semaphore:
+                try:
+                    results = await score_cell(prompt, author)
+                    await run_in_threadpool(
+                        scorecard_store.save_cell,
+                        prompt["query"], author, prompt["prompt"], fingerprint, results
+                    )
+                    progress["done"] += 1
+                except Exception as e:
+                    logger.error(f"Scorecard cell ({prompt['query']}, {author}) failed: {e}")
+                    progress["failed"] += 1
+
+        await asyncio.gather(*(compute(*cell) for cell in cells))
+        await run_in_threadpool(scorecard_store.update_job, job_id, **progress)
+        await run_in_threadpool(scorecard_store.finish_job, job_id, "completed")
+
+    except asyncio.CancelledError:
+        await run_in_threadpool(scorecard_store.update_job, job_id, **progress)
+        await run_in_threadpool(scorecard_store.finish_job, job_id, "interrupted")
+        raise
+
+    except Exception as e:
+        logger.error(f"Scorecard job {job_id} failed: {e}")
+        await run_in_threadpool(scorecard_store.finish_job, job_id, "failed", str(e))
+
+    finally:
+        heartbeat_task.cancel()
+
+
+async def start_scorecard_job(force: bool = False) -> Optional[int]:
+    """
+    Start a scorecard job in the background of this worker, unless one is already running.
+
+    Returns:
+        The id of the started job, or None if a job is running in any worker.
+    """
+    job_id = await run_in_threadpool(scorecard_store.start_job, SCORECARD_OPTIONS["lease_seconds"])
+    if job_id is not None:
+        app.state.scorecard_job = asyncio.create_task(run_scorecard_job(job_id, force))
+    return job_id
+
+
+@app.post("/scorecard/run")
+async def run_scorecard(force: bool = False) -> Dict:
+    """
+    Compute the stance of every prompt of the prompt set for every author in the collection.
+    Only cells whose prompt, documents or models changed since the last run are recomputed.
+
+    Parameters:
+        force (bool): Recompute every cell.
+
+    Returns:
+        dict: The id of the started job.
+
+    Raises:
+        HTTPException: 409 if a scorecard job is already running.
+    """
+    job_id = await start_scorecard_job(force)
+    if job_id is None:
+        raise HTTPException(status_code=409, detail="A scorecard job is already running.")
+    return {"job_id": job_id}
+
+
+@app.get("/scorecard/status")
+def get_scorecard_status() -> Dict:
+    """
+    Get the status and progress of the latest scorecard job.
+
+    Returns:
+        dict: The latest job, or None if no job has run yet.
+    """
+    try:
+        return {"job": scorecard_store.latest_job()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/scorecard")
+def get_scorecard(
+    author: Optional[str] = None,
+    prompt_query: Optional[str] = None,
+    include_results: bool = False
+    ) -> Dict:
+    """
+    Read the scorecard: the mean stance of each (prompt, author) pair.
+
+    Parameters:
+        author (str, optional): Only the cells of this author.
+        prompt_query (str, optional): Only the cells of this prompt, by its "query" name.
+        include_results (bool): Also return the evidences and stances behind each cell.
+
+    Returns:
+        dict: The cells under "cells".
+    """
+    try:
+        return {"cells": scorecard_store.cells(author, prompt_query, include_results)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,41 @@
+from typing import Any, Awaitable, Callable, Dict
+from backend.metrics import Metrics, METRICS
+import asyncio
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls: while a call for a key is in flight,
+    further calls for the same key await its result instead of repeating it.
+
+    Calls are shared within one event loop, i.e. one gunicorn worker; across
+    workers the SQLite caches serve a result once it is done. A caller that is
+    cancelled (e.g. its client disconnected) does not cancel the shared call
+    for the others.
+    """
+
+    def __init__(self, name: str, metrics: Metrics = METRICS):
+        """
+        :param name: The prefix of the metrics, "<name>.calls" and "<name>.coalesced"
+        """
+        self.name = name
+        self.metrics = metrics
+        self.calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn, or join the call already running for the key.
+        :param key: The key of everything the result depends on
+        :param fn: A coroutine function computing the result
+        :return: The result of the shared call; its exception is raised to every caller
+        """
+        call = self.calls.get(key)
+        if call is not None:
+            self.metrics.incr(f"{self.name}.coalesced")
+            return await asyncio.shield(call)
+
+        self.metrics.incr(f"{self.name}.calls")
+        call = asyncio.ensure_future(fn())
+        self.calls[key] = call
+        call.add_done_callback(lambda _: self.calls.pop(key, None))
+        return await asyncio.shield(call)
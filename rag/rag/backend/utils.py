@@ -1,8 +1,11 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, AsyncIterator, Tuple
 from backend.templates import read_prompt_template, read_tool
-from ollama import Client
+from backend.cache import make_key
+from ollama import AsyncClient
 import jinja2
 from FlagEmbedding import FlagReranker
+from functools import lru_cache
+import asyncio
 import json
 import re
 
@@ -43,7 +46,81 @@ def rank(
 
 PROMPT_TEMPLATE: str = read_prompt_template("stance_prompt")
 TOOL: dict = read_tool("stance_schema")
-CLIENT = Client(host="http://ollama:11434")
+BATCH_PROMPT_TEMPLATE: str = read_prompt_template("stance_batch_prompt")
+BATCH_TOOL: dict = read_tool("stance_batch_schema")
+# Identify the prompt and tool versions in cached stances
+TEMPLATE_HASH: str = make_key(PROMPT_TEMPLATE, json.dumps(TOOL, sort_keys=True))
+BATCH_TEMPLATE_HASH: str = make_key(BATCH_PROMPT_TEMPLATE, json.dumps(BATCH_TOOL, sort_keys=True))
+FAILED_STANCE_TEXT = "Failed to generate stance."
+# Rough prompt size estimate, used when the generator's tokenizer is not available
+CHARS_PER_TOKEN = 4
+CLIENT = AsyncClient(host="http://ollama:11434")
+
+# Generation settings, set from the Generator_options of the config by configure_generation()
+GENERATION = {
+    # Constrain the answer to the stance schema with Ollama's `format` instead of a tool call
+    "structured_output": True,
+    # Cap on generated tokens per evidence
+    "num_predict": 256,
+    # Evidences longer than this are truncated before prompting
+    "max_evidence_tokens": 1024,
+    # Hugging Face tokenizer matching the generator model, for token counts
+    "tokenizer": None,
+    # Turn off the reasoning trace of thinking models (Qwen3's /no_think switch)
+    "disable_thinking": True
+}
+
+
+def configure_generation(options: Dict) -> None:
+    GENERATION.update({key: value for key, value in options.items() if key in GENERATION})
+
+
+@lru_cache(maxsize=None)
+def load_tokenizer(name: Optional[str]):
+    if not name:
+        return None
+    try:
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(name)
+    except Exception as e:
+        print(f"Could not load the tokenizer {name}, estimating token counts instead: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    tokenizer = load_tokenizer(GENERATION["tokenizer"])
+    if tokenizer is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def truncate_evidence(text: str, max_tokens: Optional[int] = None) -> str:
+    """
+    Cut an evidence down to max_tokens tokens of the generator's tokenizer.
+    """
+    max_tokens = max_tokens or GENERATION["max_evidence_tokens"]
+    tokenizer = load_tokenizer(GENERATION["tokenizer"])
+    if tokenizer is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+
+    token_ids = tokenizer.encode(text, add_special_tokens=False)
+    if len(token_ids) <= max_tokens:
+        return text
+    return tokenizer.decode(token_ids[:max_tokens])
+
+
+def generation_options(num_evidences: int = 1) -> Dict:
+    return {"temperature": 0, "num_predict": GENERATION["num_predict"] * num_evidences}
+
+
+def response_format(tool: Dict) -> Dict:
+    """
+    The keyword arguments that make the model answer in the tool's schema:
+    a structured `format`, or the tool itself.
+    """
+    if GENERATION["structured_output"]:
+        return {"format": tool["function"]["parameters"]}
+    return {"tools": [tool]}
 
 def generate_stance_prompt(
         evidence: str,
@@ -60,9 +137,11 @@ def generate_stance_prompt(
     else:
         author = ""
     prompt = _template.render(
-        evidence=evidence,
+        evidence=truncate_evidence(evidence),
         query=query,
-        author= author
+        author= author,
+        structured=GENERATION["structured_output"],
+        no_think=GENERATION["disable_thinking"]
     )
     return prompt
 
@@ -96,54 +175,278 @@ def parse_json(content:str):
 
 
 
-def generate(
-    model_name:str, 
-    evidence: str,
-    query: str, 
-    author: Optional[str] = None,
-    ):
-    try:
-        # Generate prompt
-        prompt = generate_stance_prompt(
-            evidence, 
-            query, 
-            author
-        )
+def parse_stance(message) -> Dict:
+    """
+    Read the stance from a chat message. With structured output the content is
+    the schema's JSON object; otherwise the stance is read from the tool call if
+    there is one, or from a JSON block in the message content.
+    :param message: The (possibly accumulated) message of a chat response
+    :return: The score and the reason
+    """
+    if GENERATION["structured_output"]:
+        item = json.loads(message.get("content", ""))["evidence_scores"][0]
+        return {
+            "score": int(item["score"]),
+            "stance_text": item["reason"]
+        }
 
-        # Get response from the model
-        response = CLIENT.chat(
-            model= model_name,
-            messages=[
-                {
-                    "role": "system",
-                    "content": prompt
-                }
-            ],
-            tools = [TOOL],
-            # format= "json",
-            options={"temperature": 0}
-        )
+    try:
         # Get stance scores and reasons
-        arguments = response.get("message", {}).get("tool_calls", [])[0].get("function", {}).get("arguments", {}).get("evidence_scores", [])[0]
+        arguments = (message.get("tool_calls") or [])[0].get("function", {}).get("arguments", {}).get("evidence_scores", [])[0]
         print("Using tool call parsing")
         return {
             "score": arguments.get("score", 0),
-            "stance_text": arguments.get("reason", "Failed to generate stance.")
+            "stance_text": arguments.get("reason", FAILED_STANCE_TEXT)
         }
 
     except IndexError as e:
         # Fallback to parsing JSON from content
-        content = response.get("message", {}).get("content", "")
+        content = message.get("content", "")
         parsed_result = parse_json(content)
 
         print("Using content parsing")
         return parsed_result
 
 
+def stance_messages(
+        evidence: str,
+        query: str,
+        author: Optional[str] = None
+        ) -> List[Dict]:
+    # Generate prompt
+    prompt = generate_stance_prompt(
+        evidence, 
+        query, 
+        author
+    )
+    return [
+        {
+            "role": "system",
+            "content": prompt
+        }
+    ]
+
+
+async def generate(
+    model_name:str, 
+    evidence: str,
+    query: str, 
+    author: Optional[str] = None,
+    ):
+    try:
+        # Get response from the model
+        response = await CLIENT.chat(
+            model= model_name,
+            messages=stance_messages(evidence, query, author),
+            options=generation_options(),
+            **response_format(TOOL)
+        )
+        return parse_stance(response.get("message", {}))
 
     except Exception as e:
         print(f"Error generating stance: {e}")
         return {
             "score": 0,
-            "stance_text": "Failed to generate stance."
-        }    
+            "stance_text": FAILED_STANCE_TEXT
+        }
+
+
+async def generate_stream(
+    model_name: str,
+    evidence: str,
+    query: str,
+    author: Optional[str] = None,
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+    """
+    Generate a stance, yielding the model's output as it is produced.
+    :return: An async iterator of ("token", {"text"}) events, then one
+             ("result", {"score", "stance_text"}) event parsed like in generate()
+    """
+    content, tool_calls = [], []
+    stream = await CLIENT.chat(
+        model= model_name,
+        messages=stance_messages(evidence, query, author),
+        options=generation_options(),
+        stream=True,
+        **response_format(TOOL)
+    )
+    async for chunk in stream:
+        message = chunk.get("message", {})
+        if message.get("content"):
+            content.append(message["content"])
+            yield "token", {"text": message["content"]}
+        tool_calls.extend(message.get("tool_calls") or [])
+
+    try:
+        stance = parse_stance({"content": "".join(content), "tool_calls": tool_calls})
+    except Exception as e:
+        print(f"Error generating stance: {e}")
+        stance = {
+            "score": 0,
+            "stance_text": FAILED_STANCE_TEXT
+        }
+    yield "result", stance
+
+
+
+def generate_stance_batch_prompt(
+        evidences: List[str],
+        query: str,
+        author: Optional[str] = None
+        ) -> str:
+    
+    environment = jinja2.Environment()
+    _template = environment.from_string(BATCH_PROMPT_TEMPLATE)
+    
+    if author is not None:
+        author = f"""Here is the company in question:\n{author}"""
+    
+    else:
+        author = ""
+    prompt = _template.render(
+        evidences=[truncate_evidence(evidence) for evidence in evidences],
+        query=query,
+        author= author,
+        structured=GENERATION["structured_output"],
+        no_think=GENERATION["disable_thinking"]
+    )
+    return prompt
+
+
+def pack_evidences(
+        evidences: List[str],
+        token_budget: int,
+        max_evidences: int
+        ) -> List[List[int]]:
+    """
+    Split the evidences into groups that fit one prompt each.
+    :param evidences: The evidence texts
+    :param token_budget: The number of evidence tokens allowed per prompt
+    :param max_evidences: The maximum number of evidences per prompt
+    :return: The indices of the evidences of each group, in order
+    """
+    groups, group, used = [], [], 0
+    for i, evidence in enumerate(evidences):
+        tokens = min(count_tokens(evidence), GENERATION["max_evidence_tokens"])
+        if group and (used + tokens > token_budget or len(group) >= max_evidences):
+            groups.append(group)
+            group, used = [], 0
+        group.append(i)
+        used += tokens
+    if group:
+        groups.append(group)
+    return groups
+
+
+def parse_evidence_scores(response) -> List[Dict]:
+    """
+    Extract the evidence_scores items from a chat response: the content itself
+    with structured output, otherwise the tool call or, failing that, JSON in
+    the message content.
+    """
+    message = response.get("message", {})
+    if GENERATION["structured_output"]:
+        return json.loads(message.get("content", ""))["evidence_scores"]
+
+    for tool_call in message.get("tool_calls") or []:
+        scores = tool_call.get("function", {}).get("arguments", {}).get("evidence_scores")
+        if scores:
+            return scores
+
+    content = message.get("content", "")
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"\{", content):
+        try:
+            parsed, _ = decoder.raw_decode(content[match.start():])
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, dict):
+            arguments = parsed.get("arguments", parsed)
+            if isinstance(arguments, dict) and arguments.get("evidence_scores"):
+                return arguments["evidence_scores"]
+
+    raise ValueError("No evidence scores found in the output.")
+
+
+async def generate_group(
+    model_name: str,
+    evidences: List[str],
+    query: str,
+    author: Optional[str] = None,
+    ) -> Dict[int, Dict]:
+    """
+    Score several evidences in one call.
+    :return: The stance of each evidence that the model scored, by its index in the group
+    """
+    prompt = generate_stance_batch_prompt(evidences, query, author)
+    response = await CLIENT.chat(
+        model= model_name,
+        messages=[
+            {
+                "role": "system",
+                "content": prompt
+            }
+        ],
+        options=generation_options(len(evidences)),
+        **response_format(BATCH_TOOL)
+    )
+
+    stances = {}
+    for item in parse_evidence_scores(response):
+        try:
+            index = int(item["evidence_id"]) - 1
+            score = int(item["score"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= index < len(evidences) and -2 <= score <= 2 and index not in stances:
+            stances[index] = {
+                "score": score,
+                "stance_text": item.get("reason", "")
+            }
+    return stances
+
+
+async def generate_batch(
+    model_name: str,
+    evidences: List[str],
+    query: str,
+    author: Optional[str] = None,
+    token_budget: int = 6000,
+    max_evidences: int = 8
+    ) -> List[Dict]:
+    """
+    Generate the stance of several evidences with as few LLM calls as possible.
+    The evidences are packed into prompts under a token budget; any evidence the
+    model leaves out of its answer is scored with an individual call.
+    :param model_name: The name of the model to use
+    :param evidences: The evidence texts
+    :param query: The climate policy strand
+    :param author: The company in question
+    :param token_budget: The number of evidence tokens allowed per prompt
+    :param max_evidences: The maximum number of evidences per prompt
+    :return: One {"score", "stance_text"} per evidence, in the same order
+    """
+    groups = pack_evidences(evidences, token_budget, max_evidences)
+
+    async def score_group(group: List[int]) -> Dict[int, Dict]:
+        if len(group) > 1:
+            try:
+                stances = await generate_group(model_name, [evidences[i] for i in group], query, author)
+                return {group[i]: stance for i, stance in stances.items()}
+            except Exception as e:
+                print(f"Error generating stances for {len(group)} evidences: {e}")
+        return {}
+
+    stances: Dict[int, Dict] = {}
+    for group_stances in await asyncio.gather(*(score_group(group) for group in groups)):
+        stances.update(group_stances)
+
+    missing = [i for i in range(len(evidences)) if i not in stances]
+    if missing:
+        print(f"Falling back to individual calls for {len(missing)} of {len(evidences)} evidences")
+        results = await asyncio.gather(*(
+            generate(model_name, evidences[i], query, author) for i in missing
+        ))
+        stances.update(zip(missing, results))
+
+    return [stances[i] for i in range(len(evidences))]
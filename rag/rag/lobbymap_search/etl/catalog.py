@@ -0,0 +1,156 @@
+from typing import List, Dict, Optional
+from ..sqlite_store import SqliteStore
+import hashlib
+import sqlite3
+import time
+
+
+CATALOG_ATTRIBUTES = ["file_name", "author", "date", "region", "size", "language"]
+
+
+class DocumentCatalog(SqliteStore):
+    """
+    One row per file in the collection: its metadata, chunk count and content hash.
+
+    File-level questions (listings, facets, counts) are answered here in
+    O(files) instead of aggregating over every chunk in the vector DB.
+    The catalog lives in a SQLite file shared by all API workers.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        with self.transaction() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS documents (
+                    file_name TEXT PRIMARY KEY,
+                    author TEXT,
+                    date TEXT,
+                    region TEXT,
+                    size REAL,
+                    language TEXT,
+                    num_chunks INTEGER NOT NULL,
+                    content_hash TEXT,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS documents_author ON documents (author)")
+
+    @staticmethod
+    def check_attribute(attribute: str) -> str:
+        if attribute not in CATALOG_ATTRIBUTES:
+            raise ValueError(
+                f"Invalid attribute: {attribute}. Expected one of {CATALOG_ATTRIBUTES}."
+            )
+        return attribute
+
+    @staticmethod
+    def add_file(conn: sqlite3.Connection, file: Dict, num_chunks: int, content_hash: Optional[str]) -> None:
+        """
+        Add chunks of a file to the catalog within an open transaction.
+        Inserting into a file that is already listed adds to its chunk count.
+        """
+        conn.execute(
+            """INSERT INTO documents
+                (file_name, author, date, region, size, language, num_chunks, content_hash, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (file_name) DO UPDATE SET
+                    num_chunks = num_chunks + excluded.num_chunks,
+                    content_hash = excluded.content_hash,
+                    updated_at = excluded.updated_at""",
+            (
+                file["file_name"], file.get("author", ""), file.get("date", ""),
+                file.get("region", ""), file.get("size", 0.0), file.get("language", ""),
+                num_chunks, content_hash, time.time()
+            )
+        )
+
+    @staticmethod
+    def remove_files(conn: sqlite3.Connection, file_names: List[str]) -> None:
+        """
+        Remove files from the catalog within an open transaction.
+        """
+        conn.executemany(
+            "DELETE FROM documents WHERE file_name = ?",
+            [(file_name,) for file_name in file_names]
+        )
+
+    @staticmethod
+    def set_chunk_counts(conn: sqlite3.Connection, counts: Dict[str, int]) -> None:
+        """
+        Overwrite the chunk counts of files within an open transaction.
+        """
+        conn.executemany(
+            "UPDATE documents SET num_chunks = ?, updated_at = ? WHERE file_name = ?",
+            [(num_chunks, time.time(), file_name) for file_name, num_chunks in counts.items()]
+        )
+
+    def get_file(self, file_name: str) -> Optional[Dict]:
+        row = self.connection().execute(
+            "SELECT * FROM documents WHERE file_name = ?", (file_name,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def list_files(self, **filters: str) -> List[Dict]:
+        """
+        The files of the catalog, optionally only those whose attributes equal the given values.
+        """
+        conditions = [f"{self.check_attribute(attribute)} = ?" for attribute in filters]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.connection().execute(
+            f"""SELECT file_name, num_chunks, author, date, region, size, language, content_hash
+                FROM documents {where} ORDER BY file_name""",
+            list(filters.values())
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def unique_values(self, attribute: str, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """
+        The distinct values of an attribute with the number of chunks carrying each,
+        one page at a time when a limit is given.
+        """
+        attribute = self.check_attribute(attribute)
+        rows = self.connection().execute(
+            f"""SELECT {attribute} AS value, SUM(num_chunks) AS total_count
+                FROM documents GROUP BY {attribute} ORDER BY {attribute}
+                LIMIT ? OFFSET ?""",
+            (-1 if limit is None else limit, offset)
+        ).fetchall()
+        return [{attribute: row["value"], "total_count": row["total_count"]} for row in rows]
+
+    def count_unique(self, attribute: str) -> int:
+        attribute = self.check_attribute(attribute)
+        return self.connection().execute(
+            f"SELECT COUNT(DISTINCT {attribute}) FROM documents"
+        ).fetchone()[0]
+
+    def author_fingerprints(self) -> Dict[str, str]:
+        """
+        A digest of each author's files (names, chunk counts and content hashes),
+        which changes whenever one of their documents is added, replaced or deleted.
+        """
+        rows = self.connection().execute(
+            """SELECT author, file_name, num_chunks, content_hash
+                FROM documents ORDER BY author, file_name"""
+        ).fetchall()
+
+        digests = {}
+        for row in rows:
+            digest = digests.setdefault(row["author"], hashlib.sha256())
+            digest.update(f"{row['file_name']}\x1f{row['num_chunks']}\x1f{row['content_hash']}\x1e".encode("utf-8"))
+        return {author: digest.hexdigest() for author, digest in digests.items()}
+
+    def count(self) -> int:
+        return self.connection().execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def replace_all(self, files: List[Dict]) -> None:
+        """
+        Replace the whole catalog, e.g. to rebuild it from the vector DB.
+        """
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM documents")
+            for file in files:
+                self.add_file(conn, file, file["num_chunks"], file.get("content_hash"))
+
+    def clear(self) -> None:
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM documents")
@@ -0,0 +1,55 @@
+from typing import List, Dict
+from ollama import Client
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def cosine_similarity(a: List[float], b: List[float]) -> float:
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return sum(x * y for x, y in zip(a, b)) / norm if norm else 0.0
+
+
+class ChunkEmbedder:
+    """
+    Embed chunk texts in the RAG service through Ollama's batch embed API,
+    so the vectors can be inserted with the objects instead of having
+    Weaviate's vectorizer module call Ollama once per object.
+
+    Identical texts are embedded once per call. The vectors embed the content
+    alone, so they only share a vector space with the module's when the
+    collection does not vectorize its name (see PdfDocumentPipeline).
+    """
+
+    def __init__(self, model: str, host: str = "http://ollama:11434", batch_size: int = 64):
+        """
+        :param model: The embedding model, the same one as the collection's vectorizer
+        :param host: The Ollama server
+        :param batch_size: The number of texts sent in one embed request
+        """
+        self.model = model
+        self.client = Client(host=host)
+        self.batch_size = batch_size
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a list of texts.
+        :param texts: The texts to embed
+        :return: One vector per text, in the same order
+        """
+        unique = list(dict.fromkeys(texts))
+        vectors: Dict[str, List[float]] = {}
+
+        start = time.perf_counter()
+        for i in range(0, len(unique), self.batch_size):
+            batch = unique[i:i+self.batch_size]
+            response = self.client.embed(model=self.model, input=batch)
+            vectors.update(zip(batch, response["embeddings"]))
+
+        logger.info(
+            f"Embedded {len(unique)} unique of {len(texts)} texts in {time.perf_counter() - start:.2f}s."
+        )
+        return [vectors[text] for text in texts]
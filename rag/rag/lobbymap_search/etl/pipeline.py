@@ -1,13 +1,36 @@
 from .schemas import Chunk
-from typing import List, Dict
+from .catalog import DocumentCatalog
+from .embedder import ChunkEmbedder, cosine_similarity
+from typing import List, Dict, Optional
+from contextlib import nullcontext
+from itertools import groupby
 import weaviate
-from weaviate.classes.config import Configure, Property, DataType
+import weaviate.classes as wvc
+from weaviate.classes.config import Configure, Property, DataType, Tokenization
+from weaviate.classes.aggregate import GroupByAggregate, Metrics
 import logging
 import warnings
-import gc
+import hashlib
+import uuid
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
+# File-level properties, identical on every chunk of a file
+FILE_PROPERTIES = ["author", "date", "region", "language"]
+# All properties stored on a chunk
+CHUNK_PROPERTIES = ["file_name", "author", "date", "region", "size", "language", "content"]
+
+# Number of file names combined into one any_of filter
+FILE_FILTER_BATCH_SIZE = 100
+# Weaviate's default cap on the objects matched by a single query or batch delete
+QUERY_MAXIMUM_RESULTS = 10000
+# Extra attempts for objects that fail to load
+LOAD_RETRIES = 1
+# Stored objects compared with the embedder's vectors for the same content on connect
+PARITY_SAMPLE_SIZE = 5
+# Below this cosine similarity, the embedder's vectors are in another space than the stored ones
+PARITY_MIN_SIMILARITY = 0.999
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
@@ -23,15 +46,28 @@ class PdfDocumentPipeline:
             self,
             collection_name: str = "PdfDocument",
             vectorizer: str = "bge-m3",
-            close_client: bool = False
+            close_client: bool = False,
+            catalog: Optional[DocumentCatalog] = None,
+            embedder: Optional[ChunkEmbedder] = None,
+            content_tokenization: str = "word"
             ):
         """
         Initialize the pipeline by connecting to the Vector DB and creating the PubmedArticle collection.
+        If a catalog is given, it is kept in step with every insert and delete.
+        If an embedder is given, chunks are inserted with precomputed vectors and
+        the collection's vectorizer module is only used for objects without one;
+        on an existing collection whose stored vectors the embedder does not
+        reproduce, it is dropped and the module embeds everything.
+        content_tokenization sets how the content is split for BM25 when the
+        collection is created; metadata properties are indexed as whole values.
         """
         self.collection_name = collection_name
         self.vectorizer = vectorizer
         self.client = None
         self.close_client = close_client
+        self.catalog = catalog
+        self.embedder = embedder
+        self.content_tokenization = Tokenization(content_tokenization)
         
 
     def connect_to_weaviate(self):
@@ -59,30 +95,70 @@ class PdfDocumentPipeline:
                                 name="content_vector",
                                 source_properties=["content"],
                                 model= self.vectorizer,
-                                api_endpoint="http://host.docker.internal:11434"
+                                api_endpoint="http://host.docker.internal:11434",
+                                # Embed the content alone, the same text as the ChunkEmbedder
+                                vectorize_collection_name=False
                             )
                         ],
                    
                         properties=[
-                            Property(name="file_name", data_type=DataType.TEXT),
-                            Property(name="author", data_type=DataType.TEXT),
-                            Property(name="date", data_type=DataType.TEXT),
-                            Property(name="region", data_type=DataType.TEXT),
+                            Property(name="file_name", data_type=DataType.TEXT, tokenization=Tokenization.FIELD),
+                            Property(name="author", data_type=DataType.TEXT, tokenization=Tokenization.FIELD),
+                            Property(name="date", data_type=DataType.TEXT, tokenization=Tokenization.FIELD),
+                            Property(name="region", data_type=DataType.TEXT, tokenization=Tokenization.FIELD),
                             Property(name="size", data_type=DataType.NUMBER),
-                            Property(name= "language", data_type=DataType.TEXT),
+                            Property(name= "language", data_type=DataType.TEXT, tokenization=Tokenization.FIELD),
                             # Property(name="upload_time", data_type=DataType.TEXT),
-                            Property(name="content", data_type=DataType.TEXT),
+                            Property(name="content", data_type=DataType.TEXT, tokenization=self.content_tokenization),
                         ]
                     )
                 
                 else:
                     logger.info(f"{self.collection_name} collection already exists.")
+                    self.check_embedder_parity()
 
             except Exception as e:
                 if self.client is not None:
                     self.client.close()
                 raise e
 
+    def check_embedder_parity(self) -> None:
+        """
+        Compare the stored vectors of a few objects with the embedder's vectors for
+        their content. Collections created before the vectorizer stopped prepending
+        the collection name hold vectors of another text; inserting client-side
+        vectors there would mix two vector spaces, so the embedder is dropped
+        until the collection is re-indexed.
+        """
+        if self.embedder is None:
+            return
+        collection = self.client.collections.get(self.collection_name)
+        try:
+            sample = collection.query.fetch_objects(
+                limit=PARITY_SAMPLE_SIZE, include_vector=True, return_properties=["content"]
+            ).objects
+            sample = [obj for obj in sample if obj.vector.get("content_vector")]
+            if not sample:
+                return
+
+            vectors = self.embedder.embed([obj.properties["content"] for obj in sample])
+            similarity = min(
+                cosine_similarity(obj.vector["content_vector"], vector)
+                for obj, vector in zip(sample, vectors)
+            )
+        except Exception as e:
+            logger.warning(f"Could not compare the embedder with the stored vectors, inserting without it: {e}")
+            self.embedder = None
+            return
+
+        if similarity < PARITY_MIN_SIMILARITY:
+            logger.warning(
+                f"The stored vectors of {self.collection_name} differ from the embedder's "
+                f"(cosine similarity {similarity:.4f}); inserting without client-side vectors. "
+                "Re-index the collection to embed chunks in batches."
+            )
+            self.embedder = None
+
     def close(self):
         if self.client is not None:
             self.client.close()
@@ -90,6 +166,169 @@ class PdfDocumentPipeline:
 
 
 
+    def list_files(self, limit: int = 100000) -> List[Dict]:
+        """
+        List the files in the collection with their metadata and chunk counts.
+
+        A single group-by aggregate over file_name returns, per file, the chunk
+        count and the top occurrence of each file-level property, so the cost
+        is one round trip regardless of the number of files.
+        """
+        self.connect_to_weaviate()
+        collection = self.client.collections.get(self.collection_name)
+
+        response = collection.aggregate.over_all(
+            group_by=GroupByAggregate(prop="file_name", limit=limit),
+            total_count=True,
+            return_metrics=[
+                Metrics(prop).text(top_occurrences_value=True, min_occurrences=1)
+                for prop in FILE_PROPERTIES
+            ] + [
+                Metrics("size").number(maximum=True)
+            ]
+        )
+
+        files = []
+        for group in response.groups:
+            file = {
+                "file_name": group.grouped_by.value,
+                "num_chunks": group.total_count
+            }
+            for prop in FILE_PROPERTIES:
+                occurrences = group.properties[prop].top_occurrences
+                file[prop] = occurrences[0].value if occurrences else ""
+            file["size"] = group.properties["size"].maximum
+            files.append(file)
+
+        if len(files) >= limit:
+            logger.warning(f"Listing stopped at {limit} files; raise the limit to list them all.")
+
+        return files
+
+    def sync_catalog(self) -> None:
+        """
+        Build the catalog from the collection if it is empty, e.g. on first start
+        against an existing collection.
+        """
+        if self.catalog is None or self.catalog.count() > 0:
+            return
+
+        files = self.list_files()
+        if files:
+            logger.info(f"Rebuilding the document catalog from {len(files)} files.")
+            self.catalog.replace_all(files)
+
+    def catalog_transaction(self):
+        if self.catalog is None:
+            return nullcontext()
+        return self.catalog.transaction()
+
+    @staticmethod
+    def _file_filter(file_names: List[str]):
+        filters = [
+            wvc.query.Filter.by_property("file_name").equal(file_name)
+            for file_name in file_names
+        ]
+        return filters[0] if len(filters) == 1 else wvc.query.Filter.any_of(filters)
+
+    def count_chunks(self, file_names: List[str]) -> Dict[str, int]:
+        """
+        Count the chunks of each of the given files with filtered aggregates.
+        Files without chunks are left out of the result.
+        """
+        self.connect_to_weaviate()
+        collection = self.client.collections.get(self.collection_name)
+
+        counts = {}
+        for i in range(0, len(file_names), FILE_FILTER_BATCH_SIZE):
+            batch = file_names[i:i+FILE_FILTER_BATCH_SIZE]
+            response = collection.aggregate.over_all(
+                filters=self._file_filter(batch),
+                group_by=GroupByAggregate(prop="file_name", limit=len(batch)),
+                total_count=True
+            )
+            for group in response.groups:
+                counts[group.grouped_by.value] = group.total_count
+        return counts
+
+    def delete_files(self, file_names: List[str]) -> int:
+        """
+        Delete all chunks of the given files, together with their catalog entries.
+        The catalog is only written once the vector DB deletion is done, so its
+        write lock is held briefly; if the deletion fails partway, the catalog is
+        reconciled with the chunks that are left.
+
+        Returns the number of deleted chunks.
+        """
+        self.connect_to_weaviate()
+        collection = self.client.collections.get(self.collection_name)
+
+        deleted = 0
+        for i in range(0, len(file_names), FILE_FILTER_BATCH_SIZE):
+            batch = file_names[i:i+FILE_FILTER_BATCH_SIZE]
+            try:
+                # delete_many matches at most QUERY_MAXIMUM_RESULTS objects per call
+                while True:
+                    delete_result = collection.data.delete_many(where=self._file_filter(batch))
+                    if delete_result.failed:
+                        raise Exception(f"Failed to delete {delete_result.failed} objects from the Vector DB.")
+                    deleted += delete_result.successful
+                    if delete_result.matches < QUERY_MAXIMUM_RESULTS:
+                        break
+            except Exception:
+                self.reconcile_catalog(batch)
+                raise
+
+            with self.catalog_transaction() as conn:
+                if conn is not None:
+                    self.catalog.remove_files(conn, batch)
+
+        return deleted
+
+    def reconcile_catalog(self, file_names: List[str]) -> None:
+        """
+        Make the catalog entries of the given files match the chunks left in the collection.
+        """
+        if self.catalog is None:
+            return
+        try:
+            counts = self.count_chunks(file_names)
+        except Exception as e:
+            logger.error(f"Could not reconcile the catalog with the collection: {e}")
+            return
+
+        with self.catalog_transaction() as conn:
+            self.catalog.remove_files(conn, [file_name for file_name in file_names if file_name not in counts])
+            self.catalog.set_chunk_counts(conn, counts)
+
+    def delete_collection(self) -> None:
+        """
+        Delete the collection, then clear the catalog. As in delete_files, the
+        catalog's write lock is only taken once the vector DB deletion is done.
+        """
+        self.connect_to_weaviate()
+        self.client.collections.delete(self.collection_name)
+        if self.catalog is not None:
+            self.catalog.clear()
+
+    def _delete_objects(self, uuids: List[str]) -> None:
+        """
+        Remove the given objects, undoing a partially failed load.
+        """
+        collection = self.client.collections.get(self.collection_name)
+        for i in range(0, len(uuids), 1000):
+            collection.data.delete_many(
+                where=wvc.query.Filter.by_id().contains_any(uuids[i:i+1000])
+            )
+
+    @staticmethod
+    def content_hash(chunk_dicts: List[Dict]) -> str:
+        digest = hashlib.sha256()
+        for chunk in chunk_dicts:
+            digest.update(chunk["content"].encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
     @staticmethod
     def _transform(chunks: List[Chunk]) -> List[Dict]:
         """
@@ -107,51 +346,104 @@ class PdfDocumentPipeline:
         return chunk_dicts
 
 
-    def _load_into_vdb(self, chunk_dicts: List[Dict]):
+    def _load_into_vdb(self, chunk_dicts: List[Dict], uuids: List[str]) -> Dict[str, str]:
         """
-        Stream chunks into Weaviate in small memory-safe batches.
+        Load chunks into Weaviate with dynamic batching, embedding them first if
+        the pipeline has an embedder.
+
+        The client sizes the batches and the number of concurrent requests from
+        the observed latency and the server's queue, so one slow object does not
+        stall the load. Objects that fail are retried once; those that still fail
+        are collected instead of aborting the load.
+
+        Returns the error message of each object that could not be loaded, by uuid.
         """
         if not chunk_dicts:
             raise ValueError("No chunk dicts created. Please run the transform method first.")
 
         self.connect_to_weaviate()
-        
-        try:
-            collection = self.client.collections.get(self.collection_name)
-            
-            # Process in batches to avoid RAM overload
-            BATCH_SIZE = 5
-            for i in range(0, len(chunk_dicts), BATCH_SIZE):
-                mini_batch = chunk_dicts[i:i+BATCH_SIZE]
-                with collection.batch.fixed_size(batch_size=BATCH_SIZE) as batch:
-                    for chunk in mini_batch:
-                        batch.add_object(properties=chunk)
-                
-                failed_objs = collection.batch.failed_objects
-                if failed_objs:
-                    for failed_obj in failed_objs:
-                        logger.error(f"Failed to load object: {failed_obj}")
-                    raise Exception(f"Failed to load some objects into Vector DB.")
-                
-                del mini_batch
-                gc.collect()
-            
-            logger.info("All objects successfully added to Weaviate.")
+        collection = self.client.collections.get(self.collection_name)
 
-        except Exception as e:
-            logger.error(f"Failed to load chunks: {e}")
-            raise
+        if self.embedder is not None:
+            vectors = self.embedder.embed([chunk["content"] for chunk in chunk_dicts])
+        else:
+            vectors = [None] * len(chunk_dicts)
 
-            
-        
-    def run(self, chunks: List[Chunk]):
+        pending = list(zip(uuids, chunk_dicts, vectors))
+        failed = {}
+        for attempt in range(1 + LOAD_RETRIES):
+            with collection.batch.dynamic() as batch:
+                for chunk_uuid, chunk, vector in pending:
+                    batch.add_object(
+                        properties=chunk,
+                        uuid=chunk_uuid,
+                        vector={"content_vector": vector} if vector is not None else None
+                    )
+
+            failed = {
+                str(failed_obj.original_uuid): failed_obj.message
+                for failed_obj in collection.batch.failed_objects
+            }
+            if not failed:
+                break
+            logger.warning(f"{len(failed)} objects failed to load (attempt {attempt + 1}).")
+            pending = [item for item in pending if item[0] in failed]
+
+        for chunk_uuid, message in failed.items():
+            logger.error(f"Failed to load object {chunk_uuid}: {message}")
+        logger.info(f"Loaded {len(chunk_dicts) - len(failed)} of {len(chunk_dicts)} objects into Weaviate.")
+
+        return failed
+
+    def run(self, chunks: List[Chunk]) -> Dict:
         """
         Run the ETL pipeline to extract, transform and load the parsed pdf documents into the Vector DB.
+
+        Chunks that fail to load are reported rather than failing the whole run,
+        unless none of them could be loaded.
+
+        Returns:
+            dict: The number of loaded chunks and the failed chunks with their index, file name and error.
         """
         try:
             chunk_dicts = self._transform(chunks=chunks)
-            self._load_into_vdb(chunk_dicts=chunk_dicts)
-        
+            uuids = [str(uuid.uuid4()) for _ in chunk_dicts]
+
+            try:
+                failed = self._load_into_vdb(chunk_dicts=chunk_dicts, uuids=uuids)
+                if len(failed) == len(chunk_dicts):
+                    raise Exception("Failed to load any object into the Vector DB.")
+
+                loaded = [
+                    chunk for chunk, chunk_uuid in zip(chunk_dicts, uuids)
+                    if chunk_uuid not in failed
+                ]
+                # The catalog is only written once the load succeeded, so the
+                # write lock is held briefly rather than for the whole load.
+                with self.catalog_transaction() as conn:
+                    if conn is not None:
+                        for _, file_chunks in groupby(loaded, key=lambda c: c["file_name"]):
+                            file_chunks = list(file_chunks)
+                            self.catalog.add_file(
+                                conn,
+                                file_chunks[0],
+                                len(file_chunks),
+                                self.content_hash(file_chunks)
+                            )
+            except Exception:
+                # Keep the collection and the catalog consistent: drop what was loaded
+                self._delete_objects(uuids)
+                raise
+
+            return {
+                "loaded": len(loaded),
+                "failed": [
+                    {"index": i, "file_name": chunk["file_name"], "error": failed[chunk_uuid]}
+                    for i, (chunk, chunk_uuid) in enumerate(zip(chunk_dicts, uuids))
+                    if chunk_uuid in failed
+                ]
+            }
+
         except Exception as e:
             logger.error(f"An error occurred during the pipeline execution: {e}")
             raise e
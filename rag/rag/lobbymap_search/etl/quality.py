@@ -0,0 +1,99 @@
+from typing import List, Dict, Optional, Tuple
+from collections import Counter
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+# A short copyright notice: ©, (c) or Copyright with a year, or © or
+# "Copyright:" with a holder name, then an optional "All rights reserved".
+# Without a year, a bare "(c)" or "Copyright" opens an enumerated clause or a
+# sentence far more often than a notice.
+COPYRIGHT_NOTICE = (
+    r"^(?=.{1,120}$)"
+    r"(?:(?:copyright\s*(?:©|\(c\))?|©|\(c\))\s*\d{4}(?:\s*[-–]\s*\d{4})?[.,]?(?:\s+[\w&'’.,-]+){0,6}"
+    r"|(?:copyright\s*(?:©|\(c\)|:)|©)\s*[\w&'’.,-]+(?:\s+[\w&'’.,-]+){0,5})"
+    r"(?:\s*all rights reserved\.?)?$"
+)
+
+# Lines that carry no evidence on their own: page numbers, table rules,
+# image placeholders, bare dates and similar layout residue.
+BOILERPLATE_PATTERNS = [
+    r"^(page|seite|p\.?)\s*\d+(\s*(of|/|von)\s*\d+)?$",
+    r"^\d+(\s*/\s*\d+)?$",
+    r"^[\s|:\-=_*#>`~.]+$",
+    r"^<!--\s*image\s*-->$",
+    COPYRIGHT_NOTICE,
+    r"^all rights reserved\.?$",
+    r"^(confidential|redacted|draft)\.?$",
+    r"^https?://\S+$",
+    r"^\d{1,4}[./-]\d{1,2}[./-]\d{1,4}$",
+]
+
+
+class ChunkQualityGate:
+    """
+    Reject chunks that should never reach the vector DB: parser error output,
+    chunks with almost no text and chunks made only of layout boilerplate.
+    """
+
+    def __init__(
+            self,
+            min_chars: int = 30,
+            min_alnum_ratio: float = 0.3,
+            rejected_prefixes: Optional[List[str]] = None
+            ):
+        self.min_chars = min_chars
+        self.min_alnum_ratio = min_alnum_ratio
+        self.rejected_prefixes = [
+            prefix.lower() for prefix in (rejected_prefixes or [])
+        ]
+        self.boilerplate = [re.compile(p, re.IGNORECASE) for p in BOILERPLATE_PATTERNS]
+
+    def is_boilerplate_line(self, line: str) -> bool:
+        return any(pattern.match(line) for pattern in self.boilerplate)
+
+    def check(self, content: str) -> Optional[str]:
+        """
+        Check a single chunk.
+        :param content: The chunk text
+        :return: The rejection reason, or None if the chunk is accepted
+        """
+        text = content.strip()
+        if any(text.lower().startswith(prefix) for prefix in self.rejected_prefixes):
+            return "parse_error"
+
+        non_space = [c for c in text if not c.isspace()]
+        alnum = [c for c in non_space if c.isalnum()]
+        if len(alnum) < self.min_chars:
+            return "near_empty"
+
+        if len(alnum) / len(non_space) < self.min_alnum_ratio:
+            return "boilerplate"
+
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        if all(self.is_boilerplate_line(line) for line in lines):
+            return "boilerplate"
+
+        return None
+
+    def filter(self, contents: List[str]) -> Tuple[List[str], List[Dict]]:
+        """
+        Split chunks into accepted and rejected ones.
+        :param contents: The chunk texts of one file
+        :return: The accepted chunks and a list of {"index", "reason"} for the rejected ones
+        """
+        accepted, rejected = [], []
+        for index, content in enumerate(contents):
+            reason = self.check(content)
+            if reason is None:
+                accepted.append(content)
+            else:
+                rejected.append({"index": index, "reason": reason})
+        return accepted, rejected
+
+    @staticmethod
+    def summarize(rejected: List[Dict]) -> Dict[str, int]:
+        return dict(Counter(item["reason"] for item in rejected))
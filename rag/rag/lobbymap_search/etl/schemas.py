@@ -3,6 +3,13 @@ from typing_extensions import Self
 from pydantic import BaseModel, model_validator
 
 
+def normalize_attribute(value: Optional[str]) -> str:
+    """
+    The stored form of a filterable attribute (author, date, region). Filters,
+    cache keys and per-author versions must use it to match what was ingested.
+    """
+    return (value or "").lower()
+
   
 class Chunk(BaseModel):
     file_name: str
@@ -26,8 +33,8 @@ class Chunk(BaseModel):
     def lower_case(self) -> Self:
         """
         """
-        self.author = self.author.lower()
-        self.date = self.date.lower()
-        self.region = self.region.lower()
+        self.author = normalize_attribute(self.author)
+        self.date = normalize_attribute(self.date)
+        self.region = normalize_attribute(self.region)
         self.language = self.language.lower()
         return self
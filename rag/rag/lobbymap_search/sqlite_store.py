@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+import os
+import sqlite3
+import threading
+
+
+# How long a connection waits for another worker's write lock before failing
+BUSY_TIMEOUT_SECONDS = 30
+
+
+class SqliteStore:
+    """
+    Base of the stores kept in a SQLite file shared by all API workers.
+
+    Each thread gets its own connection in WAL mode, so readers do not block
+    the writer. Connections are in autocommit mode; writes that must be atomic
+    go through `transaction`, which takes the write lock up front.
+    """
+
+    # The synchronous pragma of the connections; NORMAL may lose the last
+    # commits on power loss, which only stores of recomputable data can afford
+    synchronous = "FULL"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            self.local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        Yield a connection inside a write transaction; commit on success, roll back on error.
+        """
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
@@ -0,0 +1,5 @@
+from pathlib import Path
+import sys
+
+# The service runs from rag/rag, importing `backend` and `lobbymap_search` as top-level packages
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "rag"))
@@ -0,0 +1,129 @@
+import pytest
+
+from backend import cache
+from backend.cache import SqliteCache, CollectionVersion, VersionCounters, make_key, normalize_text
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "state" / "cache.db")
+
+
+def test_make_key_separates_parts():
+    assert make_key("ab", "c") != make_key("a", "bc")
+    assert make_key("a", None) == make_key("a", "")
+    assert len(make_key("a")) == 64
+
+
+def test_normalize_text_collapses_whitespace():
+    assert normalize_text("  carbon \n pricing\tpolicy ") == "carbon pricing policy"
+
+
+def test_get_and_set(db_path, clock):
+    rerank_cache = SqliteCache(db_path, "scores")
+    rerank_cache.set("a", {"score": 0.5})
+    rerank_cache.set_many([("b", [1, 2], None), ("c", "text", "file.pdf")])
+
+    assert rerank_cache.get("a") == {"score": 0.5}
+    assert rerank_cache.get_many(["a", "b", "c", "missing"]) == {"a": {"score": 0.5}, "b": [1, 2], "c": "text"}
+    assert rerank_cache.get("missing") is None
+    assert rerank_cache.get_many([]) == {}
+
+
+def test_tables_share_a_file_but_not_entries(db_path, clock):
+    SqliteCache(db_path, "first").set("key", 1)
+    assert SqliteCache(db_path, "second").get("key") is None
+    # Another instance on the same table, e.g. another worker, sees the entry
+    assert SqliteCache(db_path, "first").get("key") == 1
+
+
+def test_entries_expire_after_ttl(db_path, clock):
+    rerank_cache = SqliteCache(db_path, "scores", ttl_seconds=60)
+    rerank_cache.set("key", 1)
+
+    clock.now += 59
+    assert rerank_cache.get("key") == 1
+    clock.now += 2
+    assert rerank_cache.get("key") is None
+
+
+def test_evicts_least_recently_used(db_path, clock):
+    rerank_cache = SqliteCache(db_path, "scores", max_entries=3)
+    for i, key in enumerate("abc"):
+        clock.now += 1
+        rerank_cache.set(key, i)
+    clock.now += 1
+    rerank_cache.get("a")
+
+    clock.now += 1
+    rerank_cache.set("d", 3)
+    rerank_cache.evict()
+
+    assert set(rerank_cache.get_many(["a", "b", "c", "d"])) == {"a", "c", "d"}
+
+
+def test_invalidate_by_tag(db_path, clock):
+    rerank_cache = SqliteCache(db_path, "scores")
+    rerank_cache.set_many([("a", 1, "one.pdf"), ("b", 2, "one.pdf"), ("c", 3, "two.pdf")])
+
+    assert rerank_cache.invalidate("one.pdf") == 2
+    assert rerank_cache.get_many(["a", "b", "c"]) == {"c": 3}
+
+    rerank_cache.clear()
+    assert rerank_cache.get("c") is None
+
+
+def test_collection_version(db_path):
+    version = CollectionVersion(db_path, "Docs")
+    other = CollectionVersion(db_path, "Other")
+
+    assert version.get() == 0
+    assert version.bump() == 1
+    assert CollectionVersion(db_path, "Docs").get() == 1
+    assert other.get() == 0
+
+
+def test_version_counters(db_path):
+    versions = VersionCounters(db_path, "author_versions")
+    chevron, shell = versions.get("chevron"), versions.get("shell")
+
+    versions.bump(["chevron", "chevron"])
+    assert versions.get("chevron") != chevron
+    assert versions.get("shell") == shell
+
+    before = versions.get("chevron")
+    versions.bump_all()
+    assert versions.get("chevron") != before
+    assert versions.get("shell") != shell
+    assert versions.get("never bumped") != "0.0"
+
+
+def test_author_version_ignores_request_casing(db_path):
+    pytest.importorskip("pydantic")
+    from lobbymap_search.etl.schemas import Chunk, normalize_attribute
+
+    versions = VersionCounters(db_path, "author_versions")
+    read_key = normalize_attribute("Chevron")
+    before = versions.get(read_key)
+
+    # Inserts bump the version of the stored author, which reads must find under any casing
+    chunk = Chunk(file_name="report.pdf", content="text", author="CHEVRON")
+    versions.bump([chunk.author])
+
+    assert versions.get(read_key) != before
+    assert normalize_attribute("chevron") == read_key == chunk.author
@@ -0,0 +1,140 @@
+from typing import Dict, List
+import asyncio
+import pytest
+
+from backend.cascade import cascade_rank
+from backend.metrics import Metrics
+
+
+def make_candidates(search_scores: List[float]) -> List[Dict]:
+    return [{"uuid": str(i), "confidence_score": score} for i, score in enumerate(search_scores)]
+
+
+class Reranker:
+    """Scores candidates from a fixed table and records every call."""
+
+    def __init__(self, scores: Dict[str, float]):
+        self.scores = scores
+        self.calls: List[List[str]] = []
+
+    async def __call__(self, candidates: List[Dict]) -> List[float]:
+        self.calls.append([c["uuid"] for c in candidates])
+        return [self.scores[c["uuid"]] for c in candidates]
+
+
+def run(candidates, top_k, reranker, **options):
+    return asyncio.run(cascade_rank(candidates, top_k, reranker, metrics=Metrics(), **options))
+
+
+def test_returns_top_k_by_rerank_score():
+    candidates = make_candidates([0.9, 0.8, 0.7, 0.6])
+    reranker = Reranker({"0": 0.1, "1": 0.9, "2": 0.5, "3": 0.7})
+
+    ranked = run(candidates, 2, reranker, keep_ratio=1)
+
+    assert [(c["uuid"], score) for c, score in ranked] == [("1", 0.9), ("3", 0.7)]
+
+
+def test_first_stage_keeps_a_share_of_the_candidates():
+    candidates = make_candidates([0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.3, 0.2])
+    reranker = Reranker({str(i): 0.5 for i in range(8)})
+
+    run(candidates, 2, reranker, keep_ratio=0.5, step=8)
+
+    assert reranker.calls == [["0", "1", "2", "3"]]
+
+
+def test_keep_ratio_scales_with_overfetch():
+    # Over-fetching more candidates lets the reranker see deeper into the search results
+    for num_candidates in (10, 40):
+        candidates = make_candidates([1 - i / 100 for i in range(num_candidates)])
+        reranker = Reranker({str(i): 0.5 for i in range(num_candidates)})
+
+        run(candidates, 5, reranker, keep_ratio=0.5, step=num_candidates)
+
+        assert len(reranker.calls[0]) == num_candidates // 2
+
+
+def test_candidates_without_search_score_keep_their_order():
+    # Candidates reused from the semantic cache carry no search score for the new query
+    candidates = make_candidates([None] * 6)
+    reranker = Reranker({str(i): 0.5 for i in range(6)})
+
+    run(candidates, 2, reranker, keep_ratio=0.5, step=6)
+
+    assert reranker.calls == [["0", "1", "2"]]
+
+def test_keep_ratio_keeps_at_least_top_k():
+    candidates = make_candidates([0.9, 0.8, 0.7, 0.6])
+    reranker = Reranker({str(i): 0.5 for i in range(4)})
+
+    ranked = run(candidates, 3, reranker, keep_ratio=0.25)
+
+    assert len(ranked) == 3
+
+
+def test_min_first_stage_score_keeps_at_least_top_k():
+    candidates = make_candidates([0.9, 0.2, 0.1, 0.05])
+    reranker = Reranker({str(i): 0.5 for i in range(4)})
+
+    ranked = run(candidates, 2, reranker, keep_ratio=1, min_first_stage_score=0.5)
+
+    assert len(ranked) == 2
+    assert sorted(uuid for call in reranker.calls for uuid in call) == ["0", "1"]
+
+
+def test_custom_first_stage_orders_the_steps():
+    candidates = make_candidates([0.9, 0.8, 0.7, 0.6])
+    reranker = Reranker({"0": 0.1, "1": 0.2, "2": 0.3, "3": 0.4})
+
+    async def first_stage(candidates):
+        return [float(c["uuid"]) for c in candidates]
+
+    run(candidates, 1, reranker, first_stage=first_stage, keep_ratio=1, step=2)
+
+    assert reranker.calls[0] == ["3", "2"]
+
+
+@pytest.mark.parametrize("step", [1, 2, 3, 4])
+def test_step_smaller_than_top_k(step):
+    candidates = make_candidates([1 - i / 20 for i in range(20)])
+    reranker = Reranker({str(i): 1 - i / 20 for i in range(20)})
+
+    ranked = run(candidates, 5, reranker, keep_ratio=1, step=step, margin=0.05)
+
+    assert [c["uuid"] for c, _ in ranked] == ["0", "1", "2", "3", "4"]
+    assert all(len(call) <= step for call in reranker.calls)
+
+
+def test_stops_once_top_k_is_stable():
+    candidates = make_candidates([1 - i / 20 for i in range(20)])
+    # The first step holds the best chunks, every later one scores far below them
+    reranker = Reranker({str(i): 0.9 if i < 5 else 0.1 for i in range(20)})
+    metrics = Metrics()
+
+    ranked = asyncio.run(cascade_rank(candidates, 5, reranker, keep_ratio=1, margin=0.05, metrics=metrics))
+
+    assert len(reranker.calls) == 2
+    assert [c["uuid"] for c, _ in ranked] == ["0", "1", "2", "3", "4"]
+    assert metrics.counters["cascade.early_exits"] == 1
+    assert metrics.counters["cascade.skipped"] == 10
+
+
+def test_keeps_going_while_steps_compete():
+    candidates = make_candidates([1 - i / 20 for i in range(20)])
+    # The search ranked the best chunks last
+    reranker = Reranker({str(i): i / 20 for i in range(20)})
+
+    ranked = run(candidates, 5, reranker, keep_ratio=1, margin=0.05)
+
+    assert len(reranker.calls) == 4
+    assert [c["uuid"] for c, _ in ranked] == ["19", "18", "17", "16", "15"]
+
+
+def test_fewer_candidates_than_top_k():
+    candidates = make_candidates([0.9, 0.8])
+    reranker = Reranker({"0": 0.2, "1": 0.4})
+
+    ranked = run(candidates, 5, reranker, step=2)
+
+    assert [c["uuid"] for c, _ in ranked] == ["1", "0"]
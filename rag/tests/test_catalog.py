@@ -0,0 +1,77 @@
+import pytest
+
+from lobbymap_search.etl.catalog import DocumentCatalog
+
+
+def file(file_name, author, num_chunks, content_hash, region="eu"):
+    return {
+        "file_name": file_name, "author": author, "date": "2023", "region": region,
+        "size": 1.0, "language": "latin-based", "num_chunks": num_chunks, "content_hash": content_hash
+    }
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = DocumentCatalog(str(tmp_path / "catalog.db"))
+    catalog.replace_all([
+        file("a.pdf", "chevron", 3, "h1"),
+        file("b.pdf", "chevron", 2, "h2", region="us"),
+        file("c.pdf", "shell", 4, "h3"),
+    ])
+    return catalog
+
+
+def test_list_files_with_filters(catalog):
+    assert [f["file_name"] for f in catalog.list_files()] == ["a.pdf", "b.pdf", "c.pdf"]
+    assert [f["file_name"] for f in catalog.list_files(author="chevron", region="us")] == ["b.pdf"]
+    assert catalog.list_files(author="Chevron") == []
+    with pytest.raises(ValueError):
+        catalog.list_files(content="x")
+
+
+def test_unique_values_and_counts(catalog):
+    assert catalog.unique_values("author") == [
+        {"author": "chevron", "total_count": 5},
+        {"author": "shell", "total_count": 4},
+    ]
+    assert catalog.unique_values("author", limit=1, offset=1) == [{"author": "shell", "total_count": 4}]
+    assert catalog.count_unique("region") == 2
+    assert catalog.count() == 3
+
+
+def test_adding_to_a_file_adds_to_its_chunk_count(catalog):
+    with catalog.transaction() as conn:
+        catalog.add_file(conn, file("a.pdf", "chevron", 0, None), 2, "h4")
+
+    assert catalog.get_file("a.pdf")["num_chunks"] == 5
+    assert catalog.get_file("a.pdf")["content_hash"] == "h4"
+
+
+def test_remove_and_recount(catalog):
+    with catalog.transaction() as conn:
+        catalog.remove_files(conn, ["a.pdf"])
+        catalog.set_chunk_counts(conn, {"b.pdf": 1})
+
+    assert catalog.get_file("a.pdf") is None
+    assert catalog.get_file("b.pdf")["num_chunks"] == 1
+
+
+def test_failed_transaction_rolls_back(catalog):
+    with pytest.raises(RuntimeError):
+        with catalog.transaction() as conn:
+            catalog.remove_files(conn, ["a.pdf"])
+            raise RuntimeError("vector DB deletion failed")
+
+    assert catalog.get_file("a.pdf") is not None
+
+
+def test_author_fingerprints_change_only_for_the_touched_author(catalog):
+    before = catalog.author_fingerprints()
+    assert set(before) == {"chevron", "shell"}
+
+    with catalog.transaction() as conn:
+        catalog.remove_files(conn, ["b.pdf"])
+    after = catalog.author_fingerprints()
+
+    assert after["chevron"] != before["chevron"]
+    assert after["shell"] == before["shell"]
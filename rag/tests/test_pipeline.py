@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+import sqlite3
+import pytest
+
+# The pipeline connects to Weaviate and embeds through Ollama
+for module in ("weaviate", "ollama"):
+    pytest.importorskip(module)
+
+from lobbymap_search.etl.catalog import DocumentCatalog
+from lobbymap_search.etl.pipeline import PdfDocumentPipeline
+
+
+class Collections:
+    """Records whether the catalog could be written while the vector DB was deleting."""
+
+    def __init__(self, catalog_path: str):
+        self.catalog_path = catalog_path
+        self.catalog_locked = None
+
+    def delete(self, name: str) -> None:
+        conn = sqlite3.connect(self.catalog_path, timeout=0, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("ROLLBACK")
+            self.catalog_locked = False
+        except sqlite3.OperationalError:
+            self.catalog_locked = True
+        finally:
+            conn.close()
+
+
+class Client:
+    def __init__(self, collections):
+        self.collections = collections
+
+
+class StoredVectors:
+    """A collection whose objects hold the given content vectors."""
+
+    def __init__(self, objects):
+        self.objects = [
+            SimpleNamespace(properties={"content": content}, vector={"content_vector": vector})
+            for content, vector in objects
+        ]
+        self.query = self
+
+    def get(self, name: str):
+        return self
+
+    def fetch_objects(self, limit: int, include_vector: bool, return_properties):
+        return SimpleNamespace(objects=self.objects[:limit])
+
+
+class Embedder:
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed(self, texts):
+        return [self.vectors[text] for text in texts]
+
+
+def test_delete_collection_releases_the_catalog_during_the_deletion(tmp_path):
+    catalog = DocumentCatalog(str(tmp_path / "catalog.db"))
+    catalog.replace_all([{
+        "file_name": "a.pdf", "author": "chevron", "date": "2023", "region": "eu",
+        "size": 1.0, "language": "latin-based", "num_chunks": 3, "content_hash": "h1"
+    }])
+    pipeline = PdfDocumentPipeline(catalog=catalog)
+    collections = Collections(catalog.path)
+    pipeline.client = Client(collections)
+
+    pipeline.delete_collection()
+
+    assert collections.catalog_locked is False
+    assert catalog.count() == 0
+
+
+@pytest.mark.parametrize("stored, keeps_embedder", [
+    # The module embedded the content alone, like the embedder
+    ([("carbon tax", [1.0, 0.0]), ("emissions", [0.0, 1.0])], True),
+    # The module embedded another text, e.g. with the collection name prepended
+    ([("carbon tax", [1.0, 0.0]), ("emissions", [0.3, 1.0])], False),
+    # Nothing to compare yet
+    ([], True),
+])
+def test_embedder_is_dropped_when_it_does_not_reproduce_the_stored_vectors(stored, keeps_embedder):
+    embedder = Embedder({"carbon tax": [2.0, 0.0], "emissions": [0.0, 1.0]})
+    pipeline = PdfDocumentPipeline(embedder=embedder)
+    pipeline.client = Client(StoredVectors(stored))
+
+    pipeline.check_embedder_parity()
+
+    assert (pipeline.embedder is embedder) == keeps_embedder
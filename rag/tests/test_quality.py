@@ -0,0 +1,91 @@
+import pytest
+
+from lobbymap_search.etl.quality import ChunkQualityGate
+
+
+@pytest.fixture
+def gate():
+    return ChunkQualityGate(
+        min_chars=30,
+        min_alnum_ratio=0.3,
+        rejected_prefixes=["Error parsing PDF file", "File is empty after Parsing"]
+    )
+
+
+EVIDENCE = (
+    "We support a carbon price that is economy-wide and predictable, "
+    "and we engage with policymakers on the design of the EU ETS."
+)
+
+
+def test_accepts_evidence(gate):
+    assert gate.check(EVIDENCE) is None
+
+
+def test_accepts_evidence_with_boilerplate_lines(gate):
+    assert gate.check(f"Page 3 of 12\n{EVIDENCE}\n© 2023 Chevron Corporation.") is None
+
+
+@pytest.mark.parametrize("content", [
+    "Error parsing PDF file: report.pdf could not be opened",
+    "  file is empty after parsing report.pdf and more text to pass the length",
+])
+def test_rejects_parser_errors(gate, content):
+    assert gate.check(content) == "parse_error"
+
+
+@pytest.mark.parametrize("content", ["", "   \n  ", "Page 3", "Table 1: totals"])
+def test_rejects_near_empty(gate, content):
+    assert gate.check(content) == "near_empty"
+
+
+@pytest.mark.parametrize("content", [
+    "© 2023 Chevron Corporation. All rights reserved.",
+    "(c) 2023 Chevron Corporation. All rights reserved.",
+    "Copyright 2023 Chevron Corporation, all rights reserved",
+    "Page 1 of 20\nPage 2 of 20\nPage 3 of 20\nPage 4 of 20\n12/05/2023\n12/06/2023",
+    "<!-- image -->\nhttps://www.example.com/sustainability/climate-report\n| --- | --- |",
+])
+def test_rejects_boilerplate_only_chunks(gate, content):
+    assert gate.check(content) == "boilerplate"
+
+
+def test_rejects_mostly_symbols(gate):
+    content = "| --- | --- | --- |\n" * 20 + "a1 b2 c3 d4 e5 f6 g7 h8 i9 j10 k11 l12 m13 n14 o15"
+    assert gate.check(content) == "boilerplate"
+
+
+@pytest.mark.parametrize("line", [
+    "© Chevron Corporation",
+    "Copyright: Chevron",
+    "Copyright © 2019-2023 Royal Dutch Shell plc",
+    "(c)2023 BP p.l.c. All rights reserved.",
+])
+def test_matches_copyright_notices(gate, line):
+    assert gate.is_boilerplate_line(line)
+
+
+@pytest.mark.parametrize("line", [
+    "Copyrighted works are covered by the directive.",
+    "(c) Member States",
+    "Copyright law reform",
+    "(c) 2030 targets shall be met by all Member States through national plans",
+])
+def test_copyright_needs_a_year_or_holder(gate, line):
+    assert not gate.is_boilerplate_line(line)
+
+
+@pytest.mark.parametrize("content", [
+    "(c) Member States shall ensure that the free allocation of allowances is phased out.",
+    "Copyright law reform is something we strongly support as part of our policy agenda.",
+])
+def test_accepts_evidence_starting_like_a_notice(gate, content):
+    assert gate.check(content) is None
+
+
+def test_filter_reports_rejected_indices(gate):
+    accepted, rejected = gate.filter([EVIDENCE, "Page 2", "© 2023 Chevron Corporation. All rights reserved."])
+
+    assert accepted == [EVIDENCE]
+    assert rejected == [{"index": 1, "reason": "near_empty"}, {"index": 2, "reason": "boilerplate"}]
+    assert ChunkQualityGate.summarize(rejected) == {"near_empty": 1, "boilerplate": 1}
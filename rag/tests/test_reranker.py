@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import pytest
+
+from backend.metrics import Metrics
+from backend.reranker import BatchingReranker
+
+
+class Model:
+    """Scores a pair by the length of its evidence and records every call."""
+
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+
+    def compute_score(self, pairs, normalize=True, batch_size=64):
+        self.calls.append(list(pairs))
+        if self.fail:
+            raise RuntimeError("out of memory")
+        scores = [float(len(evidence)) for _, evidence in pairs]
+        return scores[0] if len(scores) == 1 else scores
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        yield executor
+
+
+def run(reranker, *requests):
+    async def main():
+        reranker.start()
+        try:
+            return await asyncio.gather(*(reranker.score(pairs) for pairs in requests))
+        finally:
+            await reranker.stop()
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_share_one_model_call(executor):
+    model = Model()
+    reranker = BatchingReranker(model, executor, max_batch_size=64, max_wait_ms=20, metrics=Metrics())
+
+    results = run(
+        reranker,
+        [["q1", "ccc"], ["q1", "a"]],
+        [["q2", "bb"]],
+    )
+
+    assert results == [[3.0, 1.0], [2.0]]
+    assert len(model.calls) == 1
+    # Sorted by length so that padding within the model's mini-batches stays small
+    assert model.calls[0] == [["q1", "a"], ["q2", "bb"], ["q1", "ccc"]]
+
+
+def test_single_pair_gets_a_list(executor):
+    reranker = BatchingReranker(Model(), executor, metrics=Metrics())
+
+    assert run(reranker, [["q", "abcd"]]) == [[4.0]]
+
+
+def test_empty_request_skips_the_model(executor):
+    model = Model()
+    reranker = BatchingReranker(model, executor, metrics=Metrics())
+
+    assert run(reranker, []) == [[]]
+    assert model.calls == []
+
+
+def test_full_batch_is_flushed_without_waiting(executor):
+    model = Model()
+    reranker = BatchingReranker(model, executor, max_batch_size=2, max_wait_ms=10_000, metrics=Metrics())
+
+    async def main():
+        reranker.start()
+        try:
+            return await asyncio.wait_for(reranker.score([["q", "a"], ["q", "b"]]), timeout=5)
+        finally:
+            await reranker.stop()
+
+    assert asyncio.run(main()) == [1.0, 1.0]
+
+
+def test_model_errors_reach_every_request(executor):
+    reranker = BatchingReranker(Model(fail=True), executor, max_wait_ms=20, metrics=Metrics())
+
+    async def main():
+        reranker.start()
+        try:
+            return await asyncio.gather(
+                reranker.score([["q", "a"]]), reranker.score([["q", "b"]]), return_exceptions=True
+            )
+        finally:
+            await reranker.stop()
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(main()))
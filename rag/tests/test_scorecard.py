@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+
+from backend import scorecard
+from backend.scorecard import ScorecardStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ScorecardStore(str(tmp_path / "scorecard.db"))
+
+
+def test_only_one_job_holds_the_lease(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(scorecard.time, "time", lambda: now[0])
+
+    job_id = store.start_job(lease_seconds=60)
+    assert job_id is not None
+    assert store.start_job(lease_seconds=60) is None
+
+    # A heartbeat keeps the lease alive
+    now[0] += 50
+    store.update_job(job_id, total=4, done=1)
+    now[0] += 50
+    assert store.start_job(lease_seconds=60) is None
+
+    # Without one, the job is taken over and marked as interrupted
+    now[0] += 61
+    next_job_id = store.start_job(lease_seconds=60)
+    assert next_job_id not in (None, job_id)
+    latest = store.latest_job()
+    assert latest["job_id"] == next_job_id and latest["status"] == "running"
+
+
+def test_finish_job(store):
+    job_id = store.start_job(lease_seconds=60)
+    store.update_job(job_id, total=2, done=1, failed=1)
+    store.finish_job(job_id, "failed", "ollama is down")
+
+    job = store.latest_job()
+    assert (job["status"], job["total"], job["done"], job["failed"], job["error"]) == (
+        "failed", 2, 1, 1, "ollama is down"
+    )
+    assert store.start_job(lease_seconds=60) is not None
+
+
+def test_cells(store):
+    results = [{"stance": 1}, {"stance": -2}, {"stance": None}]
+    store.save_cell("carbon_tax", "chevron", "Carbon tax?", "fp1", results)
+    store.save_cell("carbon_tax", "shell", "Carbon tax?", "fp2", [])
+
+    cells = store.cells(author="chevron", include_results=True)
+    assert len(cells) == 1
+    assert cells[0]["score"] == -0.5
+    assert cells[0]["num_evidences"] == 3
+    assert cells[0]["results"] == results
+    assert "results" not in store.cells(prompt_query="carbon_tax")[0]
+    assert store.fingerprints() == {("carbon_tax", "chevron"): "fp1", ("carbon_tax", "shell"): "fp2"}
+
+
+def test_remove_cells_of_deleted_prompts_and_authors(store):
+    for prompt_query in ("carbon_tax", "ets"):
+        for author in ("chevron", "shell"):
+            store.save_cell(prompt_query, author, "prompt", "fp", [])
+
+    assert store.remove_cells(["carbon_tax"], ["chevron"]) == 3
+    assert list(store.fingerprints()) == [("carbon_tax", "chevron")]
+
+
+def test_resume_waits_for_the_lease_of_a_dead_worker(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(scorecard.time, "time", lambda: now[0])
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(scorecard.asyncio, "sleep", sleep)
+
+    # The worker running this job died just before the restart, leaving a live-looking lease
+    orphan = store.start_job(lease_seconds=60)
+    now[0] += 10
+
+    async def start():
+        return store.start_job(lease_seconds=60)
+
+    job_id = asyncio.run(scorecard.resume_interrupted_job(store, 60, start))
+
+    assert job_id not in (None, orphan)
+    assert sleeps == [51.0]
+    assert store.latest_job()["job_id"] == job_id
+
+
+def test_resume_ignores_finished_jobs(store):
+    async def start():
+        raise AssertionError("nothing to resume")
+
+    assert asyncio.run(scorecard.resume_interrupted_job(store, 60, start)) is None
+    store.finish_job(store.start_job(lease_seconds=60), "completed")
+    assert asyncio.run(scorecard.resume_interrupted_job(store, 60, start)) is None
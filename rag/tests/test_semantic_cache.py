@@ -0,0 +1,57 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend.metrics import Metrics
+from backend.semantic_cache import SemanticCache
+
+
+CANDIDATES = [{"uuid": "1"}, {"uuid": "2"}]
+
+
+def test_hit_above_threshold():
+    semantic_cache = SemanticCache(threshold=0.95, metrics=Metrics())
+    semantic_cache.add("scope", "carbon pricing", [1.0, 0.0, 0.0], CANDIDATES)
+
+    query, similarity, candidates = semantic_cache.lookup("scope", [0.99, 0.05, 0.0])
+
+    assert query == "carbon pricing"
+    assert similarity == pytest.approx(0.9987, abs=1e-3)
+    assert candidates == CANDIDATES
+    assert semantic_cache.metrics.counters["semantic_cache.hits"] == 1
+
+
+def test_miss_below_threshold_or_in_another_scope():
+    semantic_cache = SemanticCache(threshold=0.95, metrics=Metrics())
+    semantic_cache.add("scope", "carbon pricing", [1.0, 0.0], CANDIDATES)
+
+    assert semantic_cache.lookup("scope", [0.7, 0.7]) is None
+    assert semantic_cache.lookup("other scope", [1.0, 0.0]) is None
+    assert semantic_cache.metrics.counters["semantic_cache.misses"] == 2
+
+
+def test_returns_the_most_similar_query():
+    semantic_cache = SemanticCache(threshold=0.5, metrics=Metrics())
+    semantic_cache.add("scope", "a", [1.0, 0.0], [{"uuid": "a"}])
+    semantic_cache.add("scope", "b", [0.6, 0.8], [{"uuid": "b"}])
+
+    assert semantic_cache.lookup("scope", [0.5, 0.85])[0] == "b"
+
+
+def test_scale_does_not_matter():
+    semantic_cache = SemanticCache(threshold=0.99, metrics=Metrics())
+    semantic_cache.add("scope", "a", [2.0, 0.0], CANDIDATES)
+
+    assert semantic_cache.lookup("scope", [10.0, 0.0]) is not None
+
+
+def test_evicts_least_recently_used():
+    semantic_cache = SemanticCache(threshold=0.99, max_entries=2, metrics=Metrics())
+    semantic_cache.add("scope", "a", [1.0, 0.0], [{"uuid": "a"}])
+    semantic_cache.add("other", "b", [0.0, 1.0], [{"uuid": "b"}])
+    semantic_cache.lookup("scope", [1.0, 0.0])
+    semantic_cache.add("scope", "c", [0.7, 0.7], [{"uuid": "c"}])
+
+    assert semantic_cache.lookup("other", [0.0, 1.0]) is None
+    assert "other" not in semantic_cache.scopes
+    assert semantic_cache.lookup("scope", [1.0, 0.0])[0] == "a"
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+
+from backend.metrics import Metrics
+from backend.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight("test", Metrics())
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"result": len(calls)}
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", compute) for _ in range(5)))
+
+    results = asyncio.run(main())
+
+    assert calls == [1]
+    assert all(result is results[0] for result in results)
+    assert flight.metrics.counters == {"test.calls": 1, "test.coalesced": 4}
+    assert flight.calls == {}
+
+
+def test_different_keys_and_later_calls_compute_again():
+    flight = SingleFlight("test", Metrics())
+    calls = []
+
+    async def compute(value):
+        calls.append(value)
+        await asyncio.sleep(0)
+        return value
+
+    async def main():
+        first = await asyncio.gather(flight.do("a", lambda: compute("a")), flight.do("b", lambda: compute("b")))
+        second = await flight.do("a", lambda: compute("a"))
+        return first, second
+
+    assert asyncio.run(main()) == (["a", "b"], "a")
+    assert calls == ["a", "b", "a"]
+
+
+def test_exceptions_reach_every_caller():
+    flight = SingleFlight("test", Metrics())
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("search failed")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.calls == {}
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight("test", Metrics())
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        leader = asyncio.create_task(flight.do("key", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "done"
@@ -0,0 +1,44 @@
+import threading
+import pytest
+
+from lobbymap_search.sqlite_store import SqliteStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SqliteStore(str(tmp_path / "state" / "store.db"))
+    with store.transaction() as conn:
+        conn.execute("CREATE TABLE items (name TEXT PRIMARY KEY)")
+    return store
+
+
+def names(store):
+    return [row["name"] for row in store.connection().execute("SELECT name FROM items ORDER BY name")]
+
+
+def test_transaction_commits(store):
+    with store.transaction() as conn:
+        conn.execute("INSERT INTO items VALUES ('a')")
+        conn.execute("INSERT INTO items VALUES ('b')")
+
+    assert names(store) == ["a", "b"]
+    assert store.connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_transaction_rolls_back_on_error(store):
+    with pytest.raises(RuntimeError):
+        with store.transaction() as conn:
+            conn.execute("INSERT INTO items VALUES ('a')")
+            raise RuntimeError("failed midway")
+
+    assert names(store) == []
+
+
+def test_one_connection_per_thread(store):
+    connections = []
+    thread = threading.Thread(target=lambda: connections.append(store.connection()))
+    thread.start()
+    thread.join()
+
+    assert store.connection() is store.connection()
+    assert connections[0] is not store.connection()
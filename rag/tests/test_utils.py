@@ -0,0 +1,48 @@
+import pytest
+
+# backend.utils loads the Ollama client and the reranker at import time
+for module in ("ollama", "jinja2", "FlagEmbedding"):
+    pytest.importorskip(module)
+
+from backend import utils
+from backend.utils import pack_evidences
+
+
+@pytest.fixture(autouse=True)
+def estimated_tokens(monkeypatch):
+    # Without a tokenizer, a text of n characters counts as n // 4 + 1 tokens
+    monkeypatch.setitem(utils.GENERATION, "tokenizer", None)
+    monkeypatch.setitem(utils.GENERATION, "max_evidence_tokens", 1024)
+
+
+def evidence(tokens: int) -> str:
+    return "x" * (tokens - 1) * utils.CHARS_PER_TOKEN
+
+
+def test_groups_fill_up_to_the_token_budget():
+    evidences = [evidence(40), evidence(40), evidence(40), evidence(10)]
+
+    assert pack_evidences(evidences, token_budget=100, max_evidences=10) == [[0, 1], [2, 3]]
+
+
+def test_groups_stop_at_max_evidences():
+    evidences = [evidence(1)] * 5
+
+    assert pack_evidences(evidences, token_budget=1000, max_evidences=2) == [[0, 1], [2, 3], [4]]
+
+
+def test_evidence_over_the_budget_gets_its_own_group():
+    evidences = [evidence(10), evidence(500), evidence(10)]
+
+    assert pack_evidences(evidences, token_budget=100, max_evidences=10) == [[0], [1], [2]]
+
+
+def test_evidences_count_as_truncated(monkeypatch):
+    monkeypatch.setitem(utils.GENERATION, "max_evidence_tokens", 50)
+    evidences = [evidence(500), evidence(500)]
+
+    assert pack_evidences(evidences, token_budget=100, max_evidences=10) == [[0, 1]]
+
+
+def test_no_evidences():
+    assert pack_evidences([], token_budget=100, max_evidences=10) == []